@@ -0,0 +1,74 @@
+import json
+import logging
+import os
+import sys
+import threading
+
+logging.basicConfig(stream=sys.stdout, level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger("boot_time_recorder")
+
+DEFAULT_BOOT_TIMES_PATH = os.path.join(os.path.expanduser("~"), ".password_resetter", "boot_times.json")
+
+class BootTimeRecorder:
+    """
+    Keeps the boot durations measured during resets per device model, separately for normal and reduced boots, and
+    reports the boot time saved by the reduction.
+    """
+
+    def __init__(self, path: str = DEFAULT_BOOT_TIMES_PATH, max_samples: int = 20):
+        self.path = path
+        self.max_samples = max_samples
+
+        self._lock = threading.Lock()
+        self._boot_times = {}
+
+        if os.path.exists(path):
+            with open(path) as boot_times_file:
+                self._boot_times = json.load(boot_times_file)
+
+    def record(self, model: str, duration: float, reduced: bool) -> float | None:
+        """
+        Records a boot duration.
+        :param model: Device model.
+        :param duration: Boot duration in seconds.
+        :param reduced: Whether boot time reduction was used.
+        :return: Seconds saved compared to the average normal boot of the model, None if there is no normal boot to compare with.
+        """
+        with self._lock:
+            samples = self._boot_times.setdefault(model, {"normal": [], "reduced": []})
+            boot_kind = "reduced" if reduced else "normal"
+            samples[boot_kind] = (samples[boot_kind] + [round(duration, 1)])[-self.max_samples:]
+            self._save()
+
+            if not reduced or not samples["normal"]:
+                return None
+
+            saved = sum(samples["normal"]) / len(samples["normal"]) - duration
+
+        logger.info("Boot of %s took %.1f seconds, %.1f seconds less than a normal boot", model, duration, saved)
+        return saved
+
+    def report(self) -> dict:
+        """
+        Summarizes the recorded boot times.
+        :return: Mapping of device model to its average normal and reduced boot time and the time saved.
+        """
+        report = {}
+
+        with self._lock:
+            for model, samples in self._boot_times.items():
+                normal = sum(samples["normal"]) / len(samples["normal"]) if samples["normal"] else None
+                reduced = sum(samples["reduced"]) / len(samples["reduced"]) if samples["reduced"] else None
+                report[model] = {
+                    "normal": normal,
+                    "reduced": reduced,
+                    "saved": normal - reduced if normal is not None and reduced is not None else None,
+                }
+
+        return report
+
+    def _save(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w") as boot_times_file:
+            json.dump(self._boot_times, boot_times_file)
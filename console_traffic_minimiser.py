@@ -0,0 +1,128 @@
+import logging
+import sys
+import time
+
+from utils.configuration_commands import Commands
+from utils.response_patterns import ResponsePatterns
+
+from serial_connection_manager import SerialConnectionManager
+
+logging.basicConfig(stream=sys.stdout, level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger("console_traffic_minimiser")
+
+class ConsoleTrafficMinimiser:
+    """
+    Temporarily applies device settings that cut console traffic during a reset session and reverts them before the
+    configuration is saved. The settings are applied before the saved configuration is copied into the running
+    configuration, when interfaces come up and flood the console with log messages. Paging is disabled for the exec
+    session only and ends with it, so it is never reverted.
+    """
+
+    def __init__(self):
+        self.report = {}
+
+        self._restore_commands = []
+        self._reapply_after_copy = False
+        self._applied_at = None
+        self._overhead_bytes = 0
+        self._console_log_bytes_per_second = 0.0
+
+    def apply(self, serial_connection_manager: SerialConnectionManager, config_path: str):
+        """
+        Disables paging and console logging before the configuration at config_path is copied into the running
+        configuration. The console logging setting of that configuration is restored later, if it disables console
+        logging already nothing is changed.
+        Must be called in privileged exec mode and returns to privileged exec mode.
+        :param serial_connection_manager: Serial connection manager.
+        :param config_path: Path of the configuration about to be copied into the running configuration.
+        :return:
+        """
+        transferred_bytes = serial_connection_manager.bytes_sent + serial_connection_manager.bytes_received
+
+        session_started_at = serial_connection_manager.session_started_at
+        session_duration = time.time() - session_started_at if session_started_at is not None else 0.0
+        if session_duration > 0:
+            self._console_log_bytes_per_second = serial_connection_manager.console_log_bytes_received / session_duration
+
+        logger.debug("Disabling paging")
+        serial_connection_manager.send_command(Commands.disable_paging, ResponsePatterns.PRIVILEGED_EXEC_MODE)
+
+        serial_connection_manager.send_command(Commands.show_logging_console_setting.format(path=config_path), ResponsePatterns.PRIVILEGED_EXEC_MODE)
+        logging_console = ConsoleTrafficMinimiser._parse_logging_console(serial_connection_manager.last_output)
+
+        if logging_console != Commands.disable_logging_console:
+            ConsoleTrafficMinimiser._disable_logging_console(serial_connection_manager)
+            self._restore_commands.append(logging_console or Commands.enable_logging_console)
+            self._reapply_after_copy = logging_console is not None
+
+        self._applied_at = time.time()
+        self._overhead_bytes += serial_connection_manager.bytes_sent + serial_connection_manager.bytes_received - transferred_bytes
+        logger.info("Console traffic minimised")
+
+    def reapply(self, serial_connection_manager: SerialConnectionManager):
+        """
+        Disables console logging again if copying the configuration re-enabled it.
+        Must be called in privileged exec mode and returns to privileged exec mode.
+        :param serial_connection_manager: Serial connection manager.
+        :return:
+        """
+        if not self._reapply_after_copy:
+            return
+
+        transferred_bytes = serial_connection_manager.bytes_sent + serial_connection_manager.bytes_received
+        ConsoleTrafficMinimiser._disable_logging_console(serial_connection_manager)
+        self._overhead_bytes += serial_connection_manager.bytes_sent + serial_connection_manager.bytes_received - transferred_bytes
+
+    @staticmethod
+    def _disable_logging_console(serial_connection_manager: SerialConnectionManager):
+        logger.debug("Disabling console logging")
+        serial_connection_manager.send_command(Commands.enter_global_configuration_mode, ResponsePatterns.GLOBAL_CONFIGURATION_MODE)
+        serial_connection_manager.send_command(Commands.disable_logging_console, ResponsePatterns.GLOBAL_CONFIGURATION_MODE)
+        serial_connection_manager.send_command(Commands.end, ResponsePatterns.PRIVILEGED_EXEC_MODE)
+
+    def restore(self, serial_connection_manager: SerialConnectionManager) -> dict:
+        """
+        Reverts the settings changed by apply and reports the console traffic of the session.
+        Must be called in global configuration mode and returns to global configuration mode.
+        :param serial_connection_manager: Serial connection manager.
+        :return: Traffic report with bytes sent, received and estimated bytes saved.
+        """
+        transferred_bytes = serial_connection_manager.bytes_sent + serial_connection_manager.bytes_received
+
+        for restore_command in self._restore_commands:
+            serial_connection_manager.send_command(restore_command, ResponsePatterns.GLOBAL_CONFIGURATION_MODE)
+
+        self._overhead_bytes += serial_connection_manager.bytes_sent + serial_connection_manager.bytes_received - transferred_bytes
+        logger.info("Console traffic settings restored")
+
+        minimised_duration = time.time() - self._applied_at if self._applied_at is not None else 0.0
+        suppressed_bytes = round(self._console_log_bytes_per_second * minimised_duration)
+
+        self.report = {
+            "bytes_sent": serial_connection_manager.bytes_sent,
+            "bytes_received": serial_connection_manager.bytes_received,
+            "minimised_seconds": round(minimised_duration, 1),
+            "overhead_bytes": self._overhead_bytes,
+            "estimated_bytes_saved": suppressed_bytes - self._overhead_bytes,
+        }
+        logger.info("Console traffic: %d bytes sent, %d bytes received, estimated %d bytes saved",
+                    self.report["bytes_sent"], self.report["bytes_received"], self.report["estimated_bytes_saved"])
+
+        return self.report
+
+    @staticmethod
+    def _parse_logging_console(output: str) -> str | None:
+        """
+        Parses the output of Commands.show_logging_console_setting.
+        :param output: Command output including the echoed command and the trailing prompt.
+        :return: The logging console line or None if the default is used.
+        """
+        logging_console = None
+
+        for line in output.splitlines()[1:]:
+            setting = line.strip()
+
+            if ResponsePatterns.LOGGING_CONSOLE_SETTING.match(setting):
+                logging_console = setting
+
+        return logging_console
@@ -6,6 +6,7 @@ from PyQt5.QtWidgets import QApplication, QMainWindow
 from UI.ui_main_window import Ui_MainWindow
 from password_resetter import PasswordResetter
 from serial_connection_manager import SerialConnectionManager
+from utils.cancellation_token import CancellationToken
 from utils.cisco_devices import Devices
 from utils.exceptions import SelectionError
 
@@ -21,10 +22,14 @@ class PasswordResetWorker(QObject):
         self.serial_manager = serial_manager
         self.password_resetter = password_resetter
         self.device = device
+        self.cancellation_token = CancellationToken(password_resetter.timeout)
+
+    def cancel(self):
+        self.cancellation_token.cancel()
 
     def run(self):
         try:
-            self.password_resetter.reset_password(self.serial_manager, self.device)
+            self.password_resetter.reset_password(self.serial_manager, self.device, self.cancellation_token)
         except Exception as e:
             self.error.emit(str(e))
         finally:
@@ -41,6 +46,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.setWindowTitle("Cisco Password Reset Tool")
         self.initialize()
         self._resetting_password = False
+        self.worker = None
 
     def load_device_list(self):
         for device in Devices.devices:
@@ -57,6 +63,11 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
         self.confirm_button.clicked.connect(self.start)
 
+    def closeEvent(self, event):
+        if self.worker is not None:
+            self.worker.cancel()
+        super().closeEvent(event)
+
     def start(self):
         try:
             self._serial_connection_manager.port = self.serial_line_input.text()
@@ -66,6 +77,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
             self._password_resetter.remove_privileged_exec_mode_password = self.remove_privileged_exec_mode_toggle.isChecked()
             self._password_resetter.remove_line_console_password = self.remove_line_console_password_toggle.isChecked()
+            self._password_resetter.encrypt_enable_password = self.encrypt_privileged_exec_mode_password_toggle.isChecked()
 
             self._password_resetter.set_new_privileged_exec_mode_password = self.set_new_privileged_exec_mode_password_toggle.isChecked()
             self._password_resetter.set_new_line_console_password = self.new_line_console_password_toggle.isChecked()
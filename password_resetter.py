@@ -1,11 +1,18 @@
 import logging
 import sys
+import time
 
-from utils.cisco_devices import Device, BootEnvironment
+from utils.cisco_devices import Device, BootEnvironment, DeviceCapability
 from utils.configuration_commands import Commands, ROMMONCommands, SwitchBootloaderCommands
 from utils.response_patterns import ResponsePatterns
 
+from boot_time_recorder import BootTimeRecorder
+from console_traffic_minimiser import ConsoleTrafficMinimiser
+from power_controller import PowerController
+from secret_hasher import SecretHasher, SecretType
 from serial_connection_manager import SerialConnectionManager
+from utils.cancellation_token import CancellationToken
+from utils.exceptions import ResetCancelledException, IncorrectResponseException, InterruptBootException
 
 logging.basicConfig(stream=sys.stdout, level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger("password_resetter")
@@ -16,8 +23,22 @@ class PasswordResetter:
         self.remove_privileged_exec_mode_password = False
         self.remove_line_console_password = False
         self.encrypt_enable_password = False
+        self.enable_secret_type = SecretType.MD5
+        self.secret_hasher: SecretHasher | None = None
         self.set_new_privileged_exec_mode_password = False
         self.set_new_line_console_password = False
+        self.minimise_console_traffic = False
+        self.console_traffic_report = None
+        self.timeout: float | None = None
+        self.progress = []
+        self.power_controller: PowerController | None = None
+        self.power_outlet: str | None = None
+        self.power_off_duration = 5
+        self.recovery_attempts = 1
+        self.reduce_boot_time = False
+        self.boot_time_recorder: BootTimeRecorder | None = None
+        self.boot_time_saved = None
+        self.configuration_saved = False
 
         self._new_privileged_exec_mode_password = ""
         self._new_line_console_password = ""
@@ -32,6 +53,7 @@ class PasswordResetter:
             raise ValueError("New privileged exec mode password cannot be Empty")
         if not isinstance(new_privileged_exec_mode_password, str):
             raise TypeError("New privileged exec mode password must be a string")
+        self._new_privileged_exec_mode_password = new_privileged_exec_mode_password
 
     @property
     def new_line_console_password(self) -> str:
@@ -43,17 +65,88 @@ class PasswordResetter:
             raise ValueError("New line console password cannot be Empty")
         if not isinstance(new_line_console_password, str):
             raise TypeError("New line console password must be a string")
+        self._new_line_console_password = new_line_console_password
 
-    def reset_password(self, serial_connection_manager: SerialConnectionManager, device: Device):
+    def reset_password(self, serial_connection_manager: SerialConnectionManager, device: Device, cancellation_token: CancellationToken | None = None):
         """
         Resets selected passwords of a given device.
+        The reset stops as soon as the cancellation token is cancelled or its deadline passes, in which case the serial
+        connection is closed and the completed steps are left in progress.
+        If a power controller is set and the device can be interrupted with a break, the device is power cycled into its
+        bootloader first, and a device that stops responding before the new configuration is saved is power cycled and
+        reset again up to recovery_attempts times. Other devices must already be in their bootloader.
         :param serial_connection_manager: Serial connection manager.
         :param device: Target device.
+        :param cancellation_token: Cancellation token (default: a token expiring after timeout, if set).
         :return:
         """
+        if cancellation_token is None:
+            cancellation_token = CancellationToken(self.timeout)
+
+        self.progress = []
+        self.configuration_saved = False
+        serial_connection_manager.cancellation_token = cancellation_token
+        serial_connection_manager.start_session()
+
+        power_cycle = self.power_controller is not None and DeviceCapability.BREAK_INTERRUPTS_BOOT in device.capabilities
+        if self.power_controller is not None and not power_cycle:
+            logger.info("%s can't be interrupted with a break, expecting it to be in its bootloader already", device.model)
+
+        try:
+            recovery_attempts = 0
+
+            while True:
+                try:
+                    if power_cycle:
+                        self._power_cycle_into_bootloader(serial_connection_manager, device, cancellation_token)
+                    self._reset_password(serial_connection_manager, device)
+                    break
+
+                except (IncorrectResponseException, InterruptBootException) as e:
+                    if not power_cycle or self.configuration_saved or recovery_attempts >= self.recovery_attempts:
+                        raise
+                    recovery_attempts += 1
+                    logger.warning("Device stopped responding (%s), power cycling to recover", e)
+                    self.progress.append("Power cycled to recover")
+
+        except ResetCancelledException as e:
+            logger.warning("Password reset stopped after step '%s': %s", self.progress[-1] if self.progress else "none", e)
+            serial_connection_manager.close_connection()
+            raise
+
+        finally:
+            serial_connection_manager.cancellation_token = None
+            serial_connection_manager.target_environment = None
+
+    def _power_cycle_into_bootloader(self, serial_connection_manager: SerialConnectionManager, device: Device, cancellation_token: CancellationToken):
+        """
+        Power cycles the outlet of the device and sends breaks during boot until the bootloader prompt appears.
+        Only used for devices with DeviceCapability.BREAK_INTERRUPTS_BOOT.
+        :param serial_connection_manager: Serial connection manager.
+        :param device: Target device.
+        :param cancellation_token: Cancellation token.
+        :return:
+        """
+        self.power_controller.power_cycle(self.power_outlet, self.power_off_duration, cancellation_token)
+
+        bootloader_prompt = ResponsePatterns.ROMMON if device.boot_environment == BootEnvironment.ROMMON else ResponsePatterns.BOOTLOADER
+        serial_connection_manager.interrupt_boot(bootloader_prompt)
+
+        self.progress.append("Power cycled into bootloader")
+
+    def _reset_password(self, serial_connection_manager: SerialConnectionManager, device: Device):
         logger.info("starting password reset")
 
-        PasswordResetter.ignore_startup_config(serial_connection_manager, device)
+        console_traffic_minimiser = ConsoleTrafficMinimiser() if self.minimise_console_traffic else None
+
+        boot_duration, reduced_boot = PasswordResetter.ignore_startup_config(serial_connection_manager, device, self.reduce_boot_time,
+                                                                             console_traffic_minimiser)
+        self.progress.append("Startup config ignored")
+        if console_traffic_minimiser is not None:
+            self.progress.append("Console traffic minimised")
+
+        if self.boot_time_recorder is not None:
+            self.boot_time_saved = self.boot_time_recorder.record(device.model, boot_duration, reduced_boot)
 
         logger.debug("Entering global configuration mode")
         serial_connection_manager.send_command(Commands.enter_global_configuration_mode, ResponsePatterns.GLOBAL_CONFIGURATION_MODE)
@@ -63,21 +156,22 @@ class PasswordResetter:
             serial_connection_manager.send_command(Commands.remove_enable_password, ResponsePatterns.GLOBAL_CONFIGURATION_MODE)
             serial_connection_manager.send_command(Commands.remove_enable_secret_password, ResponsePatterns.GLOBAL_CONFIGURATION_MODE)
             logger.info("Removed privileged exec mode password")
+            self.progress.append("Privileged exec mode password removed")
 
             if self.new_privileged_exec_mode_password:
                 if self.encrypt_enable_password:
                     logger.debug("Setting new enable secret password")
-                    new_enable_secret_password = Commands.set_enable_secret_password
-                    new_enable_secret_password.format(password=self._new_privileged_exec_mode_password)
-                    serial_connection_manager.send_command(new_enable_secret_password, ResponsePatterns.GLOBAL_CONFIGURATION_MODE)
+                    new_enable_secret_command = Commands.set_enable_secret_hash.format(secret_type=self.enable_secret_type, secret=self._get_enable_secret())
+                    serial_connection_manager.send_command(new_enable_secret_command, ResponsePatterns.GLOBAL_CONFIGURATION_MODE)
                     logger.info("New enable secret password set")
+                    self.progress.append("New enable secret password set")
 
                 else:
                     logger.debug("Setting new enable password")
-                    new_enable_password_command = Commands.set_enable_password
-                    new_enable_password_command.format(password=self._new_privileged_exec_mode_password)
+                    new_enable_password_command = Commands.set_enable_password.format(password=self._new_privileged_exec_mode_password)
                     serial_connection_manager.send_command(new_enable_password_command, ResponsePatterns.GLOBAL_CONFIGURATION_MODE)
                     logger.info("New enable password set")
+                    self.progress.append("New enable password set")
 
         if self.remove_line_console_password:
             logger.debug("Removing line console password")
@@ -85,57 +179,109 @@ class PasswordResetter:
             serial_connection_manager.send_command(Commands.disable_login, ResponsePatterns.LINE_CONFIGURATION_MODE)
             serial_connection_manager.send_command(Commands.remove_line_console_password, ResponsePatterns.LINE_CONFIGURATION_MODE)
             logger.info("Removed line console password")
+            self.progress.append("Line console password removed")
 
             if self.new_line_console_password:
                 logger.debug("Setting new line console password")
-                new_line_console_password = Commands.set_line_console_password
-                new_line_console_password.format(password=self._new_line_console_password)
-                serial_connection_manager.send_command(Commands.set_line_console_password, ResponsePatterns.LINE_CONFIGURATION_MODE)
+                new_line_console_password_command = Commands.set_line_console_password.format(password=self._new_line_console_password)
+                serial_connection_manager.send_command(new_line_console_password_command, ResponsePatterns.LINE_CONFIGURATION_MODE)
                 serial_connection_manager.send_command(Commands.enable_login, ResponsePatterns.LINE_CONFIGURATION_MODE)
                 logger.info("New line console password set")
+                self.progress.append("New line console password set")
 
             serial_connection_manager.send_command(Commands.exit, ResponsePatterns.GLOBAL_CONFIGURATION_MODE)
             logger.debug("Exited line console configuration mode")
 
+        if console_traffic_minimiser is not None:
+            self.console_traffic_report = console_traffic_minimiser.restore(serial_connection_manager)
+
         logger.info("Saving new configuration")
 
         PasswordResetter.finish_reset(serial_connection_manager, device)
 
-        serial_connection_manager.send_command(Commands.end, None)
-        serial_connection_manager.send_command(None, ResponsePatterns.PRIVILEGED_EXEC_MODE)
+        serial_connection_manager.send_command(Commands.end, ResponsePatterns.PRIVILEGED_EXEC_MODE)
         logger.debug("Copying new running config to startup config")
-        serial_connection_manager.send_command(Commands.copy_running_config_to_startup_config, ResponsePatterns.DESTINATION_FILE_RENAME)
-        serial_connection_manager.send_command(None, ResponsePatterns.PRIVILEGED_EXEC_MODE)
+        serial_connection_manager.send_command(Commands.copy_running_config_to_startup_config, ResponsePatterns.PRIVILEGED_EXEC_MODE,
+                                               auto_responses={ResponsePatterns.DESTINATION_FILE_RENAME: "\n"})
         logger.info("New running config copied to startup config")
+        self.configuration_saved = True
+        self.progress.append("Configuration saved")
         logger.debug("Reloading device")
-        serial_connection_manager.send_command(Commands.reload, ResponsePatterns.PROCEED_WITH_RELOAD)
-        serial_connection_manager.send_command(None, None)
-        logger.info("Device reloaded")
+        try:
+            serial_connection_manager.send_command(Commands.reload, ResponsePatterns.RELOAD_STARTED, 10,
+                                                   auto_responses={ResponsePatterns.SAVE_MODIFIED_CONFIGURATION: Commands.no + "\n",
+                                                                   ResponsePatterns.CONFIRM: "\n"})
+        except IncorrectResponseException as e:
+            logger.warning("Reload not confirmed, the new configuration is already saved: %s", e)
+            self.progress.append("Reload not confirmed")
+        else:
+            logger.info("Device reloaded")
+            self.progress.append("Device reloaded")
         logger.info("Password reset finished")
 
         serial_connection_manager.close_connection()
 
+    def _get_enable_secret(self) -> str:
+        """
+        Computes the enable secret locally so the plaintext password is never sent to the device.
+        Uses the shared secret hasher if one is set, otherwise hashes in the calling thread.
+        :return: Enable secret of type enable_secret_type.
+        """
+        if self.secret_hasher is not None:
+            return self.secret_hasher.get_secret(self._new_privileged_exec_mode_password, self.enable_secret_type)
+        return SecretHasher.hash_secret(self._new_privileged_exec_mode_password, self.enable_secret_type)
+
     @staticmethod
-    def ignore_startup_config(serial_connection_manager: SerialConnectionManager, device: Device):
+    def ignore_startup_config(serial_connection_manager: SerialConnectionManager, device: Device, reduce_boot_time: bool = False,
+                              console_traffic_minimiser: ConsoleTrafficMinimiser | None = None) -> tuple[float, bool]:
         """
-        Selects different commands to use based on bootloader used by the target device.
+        Selects different commands to use based on bootloader used by the target device and takes the shortest sequence
+        the device's capabilities allow.
         :param serial_connection_manager: Serial connection manager.
         :param device: Target device.
-        :return:
+        :param reduce_boot_time: Boot switches from an explicit image path instead of letting the bootloader search flash.
+        :param console_traffic_minimiser: Console traffic minimiser applied before the saved configuration is loaded.
+        :return: Duration of the boot in seconds and whether an explicit image was booted.
         """
+        serial_connection_manager.target_environment = device.boot_environment
+        boot_duration = 0.0
+        boot_image = None
+
         if device.boot_environment == BootEnvironment.ROMMON:
             serial_connection_manager.send_command(None, ResponsePatterns.ROMMON)
             serial_connection_manager.send_command(ROMMONCommands.ignore_startup_config, ResponsePatterns.ROMMON)
             logger.debug("Swapped startup config")
             logger.debug("Reloading device")
+            boot_started_at = time.time()
             serial_connection_manager.send_command(ROMMONCommands.reload, ResponsePatterns.INITIAL_SETUP_MESSAGE, 10)
+            boot_duration = time.time() - boot_started_at
+            serial_connection_manager.target_environment = None
             serial_connection_manager.send_command(Commands.no, ResponsePatterns.EXEC_MODE)
             logger.debug("Device reloaded")
             logger.debug("Entering privileged exec mode")
             serial_connection_manager.send_command(Commands.enable, ResponsePatterns.PRIVILEGED_EXEC_MODE)
             logger.debug("Copying startup config to running config")
-            serial_connection_manager.send_command(Commands.copy_startup_config_to_running_config, ResponsePatterns.DESTINATION_FILE_RENAME)
-            serial_connection_manager.send_command(None, ResponsePatterns.PRIVILEGED_EXEC_MODE, 10)
+            PasswordResetter._copy_config_to_running_config(serial_connection_manager, Commands.copy_startup_config_to_running_config,
+                                                            Commands.startup_config_path, console_traffic_minimiser)
+            logger.debug("Startup config copied to running config")
+
+        elif DeviceCapability.IGNORE_STARTUP_CONFIG_VARIABLE in device.capabilities:
+            serial_connection_manager.send_command(None, ResponsePatterns.BOOTLOADER)
+            serial_connection_manager.send_command(SwitchBootloaderCommands.ignore_startup_config, ResponsePatterns.BOOTLOADER)
+            logger.debug("Set SWITCH_IGNORE_STARTUP_CFG")
+            boot_image = PasswordResetter._select_boot_image(serial_connection_manager) if reduce_boot_time else None
+            boot_command = SwitchBootloaderCommands.boot_image.format(image=boot_image) if boot_image is not None else SwitchBootloaderCommands.boot
+            logger.debug("Rebooting device")
+            boot_started_at = time.time()
+            serial_connection_manager.send_command(boot_command, ResponsePatterns.INITIAL_SETUP_MESSAGE, 10)
+            boot_duration = time.time() - boot_started_at
+            serial_connection_manager.target_environment = None
+            serial_connection_manager.send_command(Commands.no, ResponsePatterns.EXEC_MODE)
+            logger.debug("Device rebooted")
+            serial_connection_manager.send_command(Commands.enable, ResponsePatterns.PRIVILEGED_EXEC_MODE)
+            logger.debug("Copying startup config to running config")
+            PasswordResetter._copy_config_to_running_config(serial_connection_manager, Commands.copy_startup_config_to_running_config,
+                                                            Commands.startup_config_path, console_traffic_minimiser)
             logger.debug("Startup config copied to running config")
 
         elif device.boot_environment == BootEnvironment.SWITCH_BOOTLOADER:
@@ -143,17 +289,87 @@ class PasswordResetter:
             serial_connection_manager.send_command(SwitchBootloaderCommands.initialize_flash, ResponsePatterns.BOOTLOADER)
             serial_connection_manager.send_command(SwitchBootloaderCommands.rename_startup_config, ResponsePatterns.BOOTLOADER)
             logger.debug("Renamed config.txt")
+            boot_image = PasswordResetter._select_boot_image(serial_connection_manager) if reduce_boot_time else None
+            boot_command = SwitchBootloaderCommands.boot_image.format(image=boot_image) if boot_image is not None else SwitchBootloaderCommands.boot
             logger.debug("Rebooting device")
-            serial_connection_manager.send_command(SwitchBootloaderCommands.boot, ResponsePatterns.EXEC_MODE, 10)
+            boot_started_at = time.time()
+            serial_connection_manager.send_command(boot_command, ResponsePatterns.EXEC_MODE, 10)
+            boot_duration = time.time() - boot_started_at
+            serial_connection_manager.target_environment = None
             serial_connection_manager.send_command(Commands.no, ResponsePatterns.EXEC_MODE)
             logger.debug("Device rebooted")
             serial_connection_manager.send_command(Commands.enable, ResponsePatterns.PRIVILEGED_EXEC_MODE)
             logger.debug("Copying old startup config to running config")
-            serial_connection_manager.send_command(Commands.rename_startup_config_to_default, ResponsePatterns.DESTINATION_FILE_RENAME)
-            serial_connection_manager.send_command(None, ResponsePatterns.PRIVILEGED_EXEC_MODE)
-            serial_connection_manager.send_command(Commands.copy_config_file_to_running_config, ResponsePatterns.DESTINATION_FILE_RENAME)
-            serial_connection_manager.send_command(None, ResponsePatterns.PRIVILEGED_EXEC_MODE, 10)
+            serial_connection_manager.send_command(Commands.rename_startup_config_to_default, ResponsePatterns.PRIVILEGED_EXEC_MODE,
+                                                   auto_responses={ResponsePatterns.DESTINATION_FILE_RENAME: "\n"})
+            PasswordResetter._copy_config_to_running_config(serial_connection_manager, Commands.copy_config_file_to_running_config,
+                                                            Commands.config_file_path, console_traffic_minimiser)
+
+        return boot_duration, boot_image is not None
+
+    @staticmethod
+    def _copy_config_to_running_config(serial_connection_manager: SerialConnectionManager, copy_command: str, config_path: str,
+                                       console_traffic_minimiser: ConsoleTrafficMinimiser | None):
+        """
+        Copies the saved configuration into the running configuration, with console traffic minimised while interfaces
+        come up if a console traffic minimiser is given.
+        :param serial_connection_manager: Serial connection manager.
+        :param copy_command: Command copying the configuration.
+        :param config_path: Path of the configuration.
+        :param console_traffic_minimiser: Console traffic minimiser.
+        :return:
+        """
+        if console_traffic_minimiser is not None:
+            console_traffic_minimiser.apply(serial_connection_manager, config_path)
+
+        serial_connection_manager.send_command(copy_command, ResponsePatterns.PRIVILEGED_EXEC_MODE, 10,
+                                               auto_responses={ResponsePatterns.DESTINATION_FILE_RENAME: "\n"})
 
+        if console_traffic_minimiser is not None:
+            console_traffic_minimiser.reapply(serial_connection_manager)
+
+    @staticmethod
+    def _select_boot_image(serial_connection_manager: SerialConnectionManager) -> str | None:
+        """
+        Finds the image the switch bootloader would boot, so it can be booted by its explicit path instead of the
+        bootloader searching flash for it. Boot variables are only read, never changed, so nothing has to be restored.
+        Only an unambiguous image is returned: packages.conf, the only .bin in flash or the only .bin in the only image
+        directory. If BOOT is already set or flash holds several candidates the bootloader's own choice is kept.
+        :param serial_connection_manager: Serial connection manager.
+        :return: Path of the boot image or None to boot without an explicit image.
+        """
+        serial_connection_manager.send_command(SwitchBootloaderCommands.show_environment, ResponsePatterns.BOOTLOADER)
+        boot_variable = ResponsePatterns.BOOT_VARIABLE.search(serial_connection_manager.last_output)
+
+        if boot_variable is not None and boot_variable.group("value").strip():
+            logger.debug("BOOT is already set to %s", boot_variable.group("value"))
+            return None
+
+        directory = "flash:"
+        for _ in range(2):
+            serial_connection_manager.send_command(SwitchBootloaderCommands.list_directory.format(directory=directory), ResponsePatterns.BOOTLOADER)
+            entries = [(entry.group("type"), entry.group("name")) for entry in ResponsePatterns.DIRECTORY_ENTRY.finditer(serial_connection_manager.last_output)]
+            files = [name for entry_type, name in entries if entry_type == "-"]
+            images = [name for name in files if name.endswith(".bin")]
+            image_directories = [name for entry_type, name in entries if entry_type == "d" and "-mz." in name]
+
+            if "packages.conf" in files:
+                images = ["packages.conf"]
+
+            if len(images) == 1:
+                logger.debug("Booting explicit image %s%s", directory, images[0])
+                return directory + images[0]
+
+            if len(images) > 1 or len(image_directories) > 1:
+                logger.info("Several boot images in %s, leaving the choice to the bootloader", directory)
+                return None
+
+            if not image_directories:
+                break
+            directory = f"{directory}{image_directories[0]}/"
+
+        logger.warning("No boot image found, leaving the choice to the bootloader")
+        return None
 
     @staticmethod
     def finish_reset(serial_connection_manager: SerialConnectionManager, device: Device):
@@ -165,3 +381,6 @@ class PasswordResetter:
         """
         if device.boot_environment == BootEnvironment.ROMMON:
             serial_connection_manager.send_command(Commands.reset_config_register_to_default, ResponsePatterns.GLOBAL_CONFIGURATION_MODE)
+
+        elif DeviceCapability.IGNORE_STARTUP_CONFIG_VARIABLE in device.capabilities:
+            serial_connection_manager.send_command(Commands.stop_ignoring_startup_config, ResponsePatterns.GLOBAL_CONFIGURATION_MODE)
@@ -19,3 +19,22 @@ class PortManager:
         ports = serial.tools.list_ports.comports()
         logger.info("listing ports")
         return ports
+
+    @staticmethod
+    def get_usb_hub(port: str) -> str | None:
+        """
+        Finds the USB hub a serial port is attached to.
+        :param port: Serial port device name.
+        :return: USB location of the parent hub or None if the port is not a USB port.
+        """
+        for port_info in serial.tools.list_ports.comports():
+            if port_info.device != port or not port_info.location:
+                continue
+
+            usb_path = port_info.location.split(":")[0]
+
+            if "." in usb_path:
+                return usb_path.rsplit(".", 1)[0]
+            return usb_path.split("-")[0]
+
+        return None
@@ -0,0 +1,219 @@
+import json
+import logging
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+
+from utils.cancellation_token import CancellationToken
+from utils.exceptions import PowerControllerException
+
+logging.basicConfig(stream=sys.stdout, level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger("power_controller")
+
+class PowerController(ABC):
+    """
+    Switches the outlets of a power distribution unit.
+    """
+
+    power_on_attempts = 3
+    power_on_retry_delay = 1
+
+    @abstractmethod
+    def power_on(self, outlet: str):
+        pass
+
+    @abstractmethod
+    def power_off(self, outlet: str):
+        pass
+
+    def power_cycle(self, outlet: str, off_duration: float = 5, cancellation_token: CancellationToken | None = None):
+        """
+        Turns an outlet off and back on. The outlet is turned back on even if the off period is cancelled, and turning
+        it on is retried up to power_on_attempts times, so an unattended device is not left unpowered.
+        :param outlet: Outlet.
+        :param off_duration: Time the outlet stays off, long enough for the device's power supply to drain.
+        :param cancellation_token: Cancellation token, cancelling it ends the off period early.
+        :return:
+        """
+        logger.info("Power cycling outlet %s", outlet)
+        self.power_off(outlet)
+        try:
+            if cancellation_token is not None:
+                cancellation_token.wait(off_duration)
+            else:
+                time.sleep(off_duration)
+        finally:
+            self._power_on_with_retries(outlet)
+
+    def _power_on_with_retries(self, outlet: str):
+        for attempt in range(1, self.power_on_attempts + 1):
+            try:
+                self.power_on(outlet)
+                return
+            except PowerControllerException as e:
+                if attempt == self.power_on_attempts:
+                    raise
+                logger.warning("Could not turn outlet %s on (attempt %d of %d): %s", outlet, attempt, self.power_on_attempts, e)
+                time.sleep(self.power_on_retry_delay)
+
+    @staticmethod
+    def from_config(config: dict) -> "PowerController":
+        """
+        Creates a power controller from its configuration.
+        :param config: Configuration with "type" (simulated, http, telnet or snmp) and the type's constructor arguments.
+        :return: Power controller.
+        """
+        controller_types = {
+            "simulated": SimulatedPowerController,
+            "http": HttpPowerController,
+            "telnet": TelnetPowerController,
+            "snmp": SnmpPowerController,
+        }
+        arguments = dict(config)
+        controller_type = arguments.pop("type", None)
+
+        if controller_type not in controller_types:
+            raise PowerControllerException(f"Unknown power controller type {controller_type}")
+
+        return controller_types[controller_type](**arguments)
+
+    @staticmethod
+    def load_outlet_map(path: str) -> dict[str, tuple["PowerController", str]]:
+        """
+        Loads the mapping of serial ports to power outlets.
+        The file contains "controllers", mapping names to power controller configurations, and "outlets", mapping serial
+        ports to {"controller": <name>, "outlet": <outlet>}.
+        :param path: Path to the JSON file.
+        :return: Mapping of serial port to power controller and outlet.
+        """
+        with open(path) as config_file:
+            config = json.load(config_file)
+
+        controllers = {name: PowerController.from_config(controller_config) for name, controller_config in config["controllers"].items()}
+
+        return {
+            port: (controllers[outlet_config["controller"]], str(outlet_config["outlet"]))
+            for port, outlet_config in config["outlets"].items()
+        }
+
+
+class SimulatedPowerController(PowerController):
+    """
+    Power controller without hardware for tests. Records every switching event and calls on_power_on after an outlet
+    is turned on, which lets a test feed boot output to a simulated console.
+    """
+
+    def __init__(self, on_power_on=None):
+        self.on_power_on = on_power_on
+        self.outlet_states = {}
+        self.events = []
+
+    def power_on(self, outlet: str):
+        self.outlet_states[outlet] = True
+        self.events.append((time.time(), outlet, "on"))
+        if self.on_power_on is not None:
+            self.on_power_on(outlet)
+
+    def power_off(self, outlet: str):
+        self.outlet_states[outlet] = False
+        self.events.append((time.time(), outlet, "off"))
+
+    def power_cycle(self, outlet: str, off_duration: float = 0, cancellation_token: CancellationToken | None = None):
+        super().power_cycle(outlet, off_duration, cancellation_token)
+
+
+class HttpPowerController(PowerController):
+    """
+    Networked PDU switched with HTTP requests, for example url_template "http://pdu/outlet/{outlet}/{state}".
+    """
+
+    def __init__(self, url_template: str, method: str = "POST", on_state: str = "on", off_state: str = "off",
+                 username: str | None = None, password: str | None = None, timeout: float = 10):
+        self.url_template = url_template
+        self.method = method
+        self.on_state = on_state
+        self.off_state = off_state
+        self.timeout = timeout
+
+        self._opener = urllib.request.build_opener()
+        if username is not None:
+            password_manager = urllib.request.HTTPPasswordMgrWithDefaultRealm()
+            password_manager.add_password(None, url_template.split("{")[0], username, password)
+            self._opener = urllib.request.build_opener(urllib.request.HTTPBasicAuthHandler(password_manager))
+
+    def power_on(self, outlet: str):
+        self._switch(outlet, self.on_state)
+
+    def power_off(self, outlet: str):
+        self._switch(outlet, self.off_state)
+
+    def _switch(self, outlet: str, state: str):
+        request = urllib.request.Request(self.url_template.format(outlet=outlet, state=state), method=self.method)
+        try:
+            with self._opener.open(request, timeout=self.timeout):
+                pass
+        except OSError as e:
+            raise PowerControllerException(f"Could not switch outlet {outlet} {state}: {e}")
+
+
+class TelnetPowerController(PowerController):
+    """
+    PDU with a line based telnet or raw TCP command interface. login_lines are sent after connecting, for example a
+    username and password.
+    """
+
+    def __init__(self, host: str, port: int = 23, on_command: str = "on {outlet}", off_command: str = "off {outlet}",
+                 login_lines: list[str] | None = None, timeout: float = 10):
+        self.host = host
+        self.port = port
+        self.on_command = on_command
+        self.off_command = off_command
+        self.login_lines = login_lines if login_lines is not None else []
+        self.timeout = timeout
+
+    def power_on(self, outlet: str):
+        self._send(self.on_command.format(outlet=outlet))
+
+    def power_off(self, outlet: str):
+        self._send(self.off_command.format(outlet=outlet))
+
+    def _send(self, command: str):
+        try:
+            with socket.create_connection((self.host, self.port), timeout=self.timeout) as connection:
+                for line in self.login_lines + [command]:
+                    connection.sendall((line + "\r\n").encode())
+                    time.sleep(0.5)
+        except OSError as e:
+            raise PowerControllerException(f"Could not send {command!r} to {self.host}: {e}")
+
+
+class SnmpPowerController(PowerController):
+    """
+    PDU switched over SNMP using the net-snmp snmpset command. The defaults match the outlet control OID of APC
+    switched rack PDUs.
+    """
+
+    def __init__(self, host: str, community: str = "private", oid_template: str = ".1.3.6.1.4.1.318.1.1.12.3.3.1.1.4.{outlet}",
+                 on_value: int = 1, off_value: int = 2, timeout: float = 10):
+        self.host = host
+        self.community = community
+        self.oid_template = oid_template
+        self.on_value = on_value
+        self.off_value = off_value
+        self.timeout = timeout
+
+    def power_on(self, outlet: str):
+        self._set(outlet, self.on_value)
+
+    def power_off(self, outlet: str):
+        self._set(outlet, self.off_value)
+
+    def _set(self, outlet: str, value: int):
+        command = ["snmpset", "-v2c", "-c", self.community, self.host, self.oid_template.format(outlet=outlet), "i", str(value)]
+        try:
+            subprocess.run(command, check=True, capture_output=True, timeout=self.timeout)
+        except (OSError, subprocess.SubprocessError) as e:
+            raise PowerControllerException(f"Could not set outlet {outlet} to {value}: {e}")
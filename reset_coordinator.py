@@ -0,0 +1,163 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from utils.exceptions import SelectionError
+
+logging.basicConfig(stream=sys.stdout, level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger("reset_coordinator")
+
+FINAL_JOB_STATUSES = ("FINISHED", "FAILED", "CANCELLED")
+TOKEN_HEADER = "X-Reset-Token"
+TOKEN_ENVIRONMENT_VARIABLE = "RESET_DAEMON_TOKEN"
+
+class ResetCoordinator:
+    """
+    Distributes reset jobs over reset daemons running as agents on several lab hosts and gathers their results.
+    Each agent advertises the serial ports of its host, a job is sent to the agent that has the job's port.
+    The token, if set, is sent with every request and must match the token the agents were started with.
+    """
+
+    def __init__(self, agent_urls: list[str], request_timeout: float = 10, token: str | None = None):
+        self.agent_urls = [agent_url.rstrip("/") for agent_url in agent_urls]
+        self.request_timeout = request_timeout
+        self.token = token
+
+        self._agent_ports = {}
+        self._submitted_jobs = []
+
+    def refresh_ports(self) -> dict:
+        """
+        Fetches the serial ports advertised by every agent. Unreachable agents advertise no ports.
+        :return: Mapping of agent URL to its list of ports.
+        """
+        for agent_url in self.agent_urls:
+            try:
+                self._agent_ports[agent_url] = [port_info["port"] for port_info in self._request(agent_url, "GET", "/ports")]
+            except (urllib.error.URLError, OSError) as e:
+                logger.warning("Agent %s is unreachable: %s", agent_url, e)
+                self._agent_ports[agent_url] = []
+
+        return dict(self._agent_ports)
+
+    def submit(self, job_request: dict) -> dict:
+        """
+        Sends a job to the agent that has the job's port.
+        Port names such as /dev/ttyUSB0 or COM3 exist on many hosts, so a job for a port advertised by several agents
+        must be pinned to one of them with the "agent" key of the job request.
+        :param job_request: Job request as accepted by POST /jobs of the reset daemon, optionally with "agent".
+        :return: Job summary returned by the agent, with the agent URL added.
+        """
+        if not self._agent_ports:
+            self.refresh_ports()
+
+        job_request = dict(job_request)
+        pinned_agent = job_request.pop("agent", None)
+
+        candidate_agents = [
+            agent_url for agent_url, ports in self._agent_ports.items()
+            if job_request.get("port") in ports and (pinned_agent is None or agent_url == pinned_agent.rstrip("/"))
+        ]
+        if not candidate_agents:
+            raise SelectionError(f"No agent has port {job_request.get('port')}")
+        if len(candidate_agents) > 1:
+            raise SelectionError(f"Port {job_request.get('port')} exists on agents {', '.join(candidate_agents)}, pin the job with \"agent\"")
+
+        agent_url = candidate_agents[0]
+
+        job = self._request(agent_url, "POST", "/jobs", job_request)
+        job["agent"] = agent_url
+        self._submitted_jobs.append(job)
+        logger.info("Sent job %s for %s to %s", job["job_id"], job["port"], agent_url)
+
+        return job
+
+    def wait_for_results(self, poll_interval: float = 2, timeout: float | None = None) -> list:
+        """
+        Waits until every submitted job has finished and gathers their results and console transcripts.
+        :param poll_interval: Delay between status polls.
+        :param timeout: Maximum time to wait (default: no limit).
+        :return: Final job summaries with the agent URL and transcript added.
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+        results = {}
+
+        while len(results) < len(self._submitted_jobs):
+            for submitted_job in self._submitted_jobs:
+                if submitted_job["job_id"] in results:
+                    continue
+
+                agent_url = submitted_job["agent"]
+                try:
+                    job = self._request(agent_url, "GET", f"/jobs/{submitted_job['job_id']}")
+                    if job["status"] in FINAL_JOB_STATUSES:
+                        job["transcript"] = self._request(agent_url, "GET", f"/jobs/{job['job_id']}/transcript")
+                except (urllib.error.URLError, OSError) as e:
+                    logger.warning("Could not poll job %s on %s: %s", submitted_job["job_id"], agent_url, e)
+                    continue
+
+                if job["status"] in FINAL_JOB_STATUSES:
+                    job["agent"] = agent_url
+                    results[job["job_id"]] = job
+                    logger.info("Job %s on %s %s", job["job_id"], agent_url, job["status"].lower())
+
+            if len(results) < len(self._submitted_jobs):
+                if deadline is not None and time.time() >= deadline:
+                    logger.warning("Stopped waiting with %d jobs unfinished", len(self._submitted_jobs) - len(results))
+                    break
+                time.sleep(poll_interval)
+
+        return list(results.values())
+
+    def _request(self, agent_url: str, method: str, path: str, payload: dict | None = None):
+        """
+        Sends a request to an agent.
+        :param agent_url: Agent URL.
+        :param method: HTTP method.
+        :param path: Request path.
+        :param payload: JSON payload.
+        :return: Decoded JSON response, or text for text responses.
+        """
+        data = json.dumps(payload).encode() if payload is not None else None
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers[TOKEN_HEADER] = self.token
+        request = urllib.request.Request(agent_url + path, data=data, method=method, headers=headers)
+
+        with urllib.request.urlopen(request, timeout=self.request_timeout) as response:
+            body = response.read().decode()
+            if response.headers.get_content_type() == "application/json":
+                return json.loads(body)
+            return body
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distribute password reset jobs over reset daemon agents")
+    parser.add_argument("jobs", help="JSON file with a list of job requests")
+    parser.add_argument("--agent", action="append", required=True, help="Agent URL, for example http://lab-host-1:8750")
+    parser.add_argument("--transcripts", default="transcripts", help="Directory the console transcripts are written to")
+    parser.add_argument("--timeout", type=float, default=None)
+    parser.add_argument("--token", default=os.environ.get(TOKEN_ENVIRONMENT_VARIABLE),
+                        help=f"Shared token of the agents (default: ${TOKEN_ENVIRONMENT_VARIABLE})")
+    arguments = parser.parse_args()
+
+    with open(arguments.jobs) as jobs_file:
+        job_requests = json.load(jobs_file)
+
+    coordinator = ResetCoordinator(arguments.agent, token=arguments.token)
+    for job_request in job_requests:
+        try:
+            coordinator.submit(job_request)
+        except (SelectionError, urllib.error.URLError) as e:
+            logger.error("Could not submit job for %s: %s", job_request.get("port"), e)
+
+    os.makedirs(arguments.transcripts, exist_ok=True)
+    for result in coordinator.wait_for_results(timeout=arguments.timeout):
+        with open(os.path.join(arguments.transcripts, f"{result['job_id']}.txt"), "w", encoding="utf-8") as transcript_file:
+            transcript_file.write(result.pop("transcript"))
+        print(json.dumps(result))
@@ -0,0 +1,667 @@
+import argparse
+import heapq
+import hmac
+import itertools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from boot_time_recorder import BootTimeRecorder, DEFAULT_BOOT_TIMES_PATH
+from password_resetter import PasswordResetter
+from port_manager import PortManager
+from power_controller import PowerController
+from secret_hasher import SecretHasher, SecretType
+from serial_connection_manager import SerialConnectionManager
+from utils.cisco_devices import Device, Devices
+from utils.cancellation_token import CancellationToken
+from utils.exceptions import JobNotFoundException, ResetCancelledException
+
+logging.basicConfig(stream=sys.stdout, level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger("reset_daemon")
+
+TOKEN_HEADER = "X-Reset-Token"
+TOKEN_ENVIRONMENT_VARIABLE = "RESET_DAEMON_TOKEN"
+JOB_LOGGER_NAMES = ("password_resetter", "serial_connection", "console_traffic_minimiser", "power_controller", "boot_time_recorder")
+
+
+class JobStatus:
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    FINISHED = "FINISHED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+    FINAL = (FINISHED, FAILED, CANCELLED)
+
+
+class ResetJob:
+
+    def __init__(self, port: str, baud_rate: int, device: Device, priority: int = 0, options: dict | None = None, timeout: float | None = None):
+        self.job_id = uuid.uuid4().hex
+        self.port = port
+        self.baud_rate = baud_rate
+        self.device = device
+        self.priority = priority
+        self.options = options if options is not None else {}
+        self.timeout = timeout
+        self.cancellation_token = CancellationToken()
+
+        self.status = JobStatus.QUEUED
+        self.error = None
+        self.usb_hub = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.console_traffic_report = None
+        self.boot_time_saved = None
+        self.progress = []
+        self.transcript = ""
+        self.events = []
+
+    @staticmethod
+    def from_dict(job_request: dict) -> "ResetJob":
+        """
+        Creates a job from a decoded API request. The reset options are validated by building the job's password resetter.
+        :param job_request: Job request containing port, baud_rate, device model, priority, timeout and reset options.
+        :return: New job.
+        """
+        if not isinstance(job_request.get("port"), str):
+            raise TypeError("Port must be a string.")
+        if not isinstance(job_request.get("options", {}), dict):
+            raise TypeError("Options must be an object.")
+
+        job = ResetJob(
+            port=job_request["port"],
+            baud_rate=int(job_request.get("baud_rate", 9600)),
+            device=Devices.get_device(job_request.get("device")),
+            priority=int(job_request.get("priority", 0)),
+            options=job_request.get("options", {}),
+            timeout=float(job_request["timeout"]) if job_request.get("timeout") is not None else None,
+        )
+        job.build_password_resetter()
+
+        return job
+
+    def build_password_resetter(self) -> PasswordResetter:
+        """
+        Creates a password resetter configured from the job options.
+        :return: Configured password resetter.
+        """
+        password_resetter = PasswordResetter()
+        password_resetter.remove_privileged_exec_mode_password = bool(self.options.get("remove_privileged_exec_mode_password", False))
+        password_resetter.remove_line_console_password = bool(self.options.get("remove_line_console_password", False))
+        password_resetter.encrypt_enable_password = bool(self.options.get("encrypt_enable_password", False))
+        password_resetter.minimise_console_traffic = bool(self.options.get("minimise_console_traffic", False))
+        password_resetter.reduce_boot_time = bool(self.options.get("reduce_boot_time", False))
+        if "enable_secret_type" in self.options:
+            password_resetter.enable_secret_type = int(self.options["enable_secret_type"])
+            if password_resetter.enable_secret_type not in SecretType.ALL:
+                raise ValueError(f"Unsupported enable secret type {password_resetter.enable_secret_type}")
+
+        if self.options.get("new_privileged_exec_mode_password"):
+            password_resetter.set_new_privileged_exec_mode_password = True
+            password_resetter.new_privileged_exec_mode_password = self.options["new_privileged_exec_mode_password"]
+        if self.options.get("new_line_console_password"):
+            password_resetter.set_new_line_console_password = True
+            password_resetter.new_line_console_password = self.options["new_line_console_password"]
+
+        return password_resetter
+
+    def to_dict(self) -> dict:
+        """
+        Serializes the job without its event history or passwords. Passwords are also masked in the events and transcript.
+        :return: Job summary.
+        """
+        return {
+            "job_id": self.job_id,
+            "port": self.port,
+            "baud_rate": self.baud_rate,
+            "device": self.device.model,
+            "priority": self.priority,
+            "status": self.status,
+            "error": self.error,
+            "usb_hub": self.usb_hub,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "timeout": self.timeout,
+            "progress": self.progress,
+            "console_traffic_report": self.console_traffic_report,
+            "boot_time_saved": self.boot_time_saved,
+        }
+
+
+class _JobLogHandler(logging.Handler):
+    """
+    Forwards log records emitted by a job's worker thread into the job's event stream.
+    """
+
+    def __init__(self, scheduler: "ResetScheduler"):
+        super().__init__(logging.INFO)
+        self._scheduler = scheduler
+        self._jobs_by_thread = {}
+
+    def attach(self, job: ResetJob):
+        self._jobs_by_thread[threading.get_ident()] = job
+
+    def detach(self):
+        self._jobs_by_thread.pop(threading.get_ident(), None)
+
+    def emit(self, record: logging.LogRecord):
+        job = self._jobs_by_thread.get(record.thread)
+        if job is not None:
+            self._scheduler.record_event(job, job.status, record.getMessage())
+
+
+class ResetScheduler:
+
+    def __init__(self, max_concurrent_jobs: int = 4, max_jobs_per_hub: int = 2, keep_ports_warm: bool = True,
+                 power_outlets: dict[str, tuple[PowerController, str]] | None = None, boot_time_recorder: BootTimeRecorder | None = None):
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.max_jobs_per_hub = max_jobs_per_hub
+        self.keep_ports_warm = keep_ports_warm
+        self.power_outlets = power_outlets if power_outlets is not None else {}
+        self.boot_time_recorder = boot_time_recorder if boot_time_recorder is not None else BootTimeRecorder()
+
+        self._jobs = {}
+        self._queue = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+        self._running_jobs = 0
+        self._busy_ports = set()
+        self._hub_load = {}
+        self._warm_connections = {}
+        self._warming_ports = set()
+        self._secret_hasher = SecretHasher()
+
+        self._stopping = False
+        self._dispatcher = None
+
+        self._log_handler = _JobLogHandler(self)
+        for logger_name in JOB_LOGGER_NAMES:
+            logging.getLogger(logger_name).addHandler(self._log_handler)
+
+    def start(self):
+        """
+        Starts the dispatcher thread.
+        :return:
+        """
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="reset-dispatcher", daemon=True)
+        self._dispatcher.start()
+        logger.info("Scheduler started with %d job slots and %d slots per USB hub", self.max_concurrent_jobs, self.max_jobs_per_hub)
+
+    def stop(self):
+        """
+        Stops dispatching new jobs and closes warm connections. Running jobs are left to finish.
+        :return:
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+
+            for serial_connection_manager in self._warm_connections.values():
+                serial_connection_manager.close_connection()
+            self._warm_connections.clear()
+
+        for logger_name in JOB_LOGGER_NAMES:
+            logging.getLogger(logger_name).removeHandler(self._log_handler)
+
+        self._secret_hasher.shutdown()
+
+    def submit(self, job: ResetJob) -> ResetJob:
+        """
+        Queues a job for execution.
+        :param job: Job to queue.
+        :return: Queued job.
+        """
+        job.usb_hub = PortManager.get_usb_hub(job.port)
+
+        with self._condition:
+            self._jobs[job.job_id] = job
+            heapq.heappush(self._queue, (-job.priority, next(self._sequence), job))
+            self.record_event(job, JobStatus.QUEUED, f"Queued on {job.port} with priority {job.priority}")
+            self._condition.notify_all()
+
+        self._warm_up(job.port, job.baud_rate)
+        self._precompute_secret(job)
+
+        return job
+
+    def get_job(self, job_id: str) -> ResetJob:
+        """
+        Returns a job by its id.
+        :param job_id: Job id.
+        :return: Matching job.
+        """
+        with self._condition:
+            if job_id not in self._jobs:
+                raise JobNotFoundException(f"Job {job_id} does not exist")
+            return self._jobs[job_id]
+
+    def cancel(self, job_id: str) -> ResetJob:
+        """
+        Cancels a job. Queued jobs are removed from the queue and the warm connection of their port is closed unless another
+        queued job needs it, running jobs stop at their next read or write and release their port.
+        :param job_id: Job id.
+        :return: Cancelled job.
+        """
+        job = self.get_job(job_id)
+
+        with self._condition:
+            if job.status in JobStatus.FINAL:
+                return job
+
+            job.cancellation_token.cancel("Job cancelled")
+
+            queued_entry = next((entry for entry in self._queue if entry[2] is job), None)
+            if queued_entry is not None:
+                self._queue.remove(queued_entry)
+                heapq.heapify(self._queue)
+                job.error = "Job cancelled before it started"
+                job.finished_at = time.time()
+                self.record_event(job, JobStatus.CANCELLED, job.error)
+
+                if not self._has_queued_job(job.port) and job.port in self._warm_connections:
+                    self._warm_connections.pop(job.port).close_connection()
+
+        return job
+
+    def list_jobs(self) -> list:
+        """
+        Lists all known jobs ordered by submission time.
+        :return: List of jobs.
+        """
+        with self._condition:
+            return sorted(self._jobs.values(), key=lambda job: job.submitted_at)
+
+    def record_event(self, job: ResetJob, status: str, message: str):
+        """
+        Updates the job status and appends an event to its stream.
+        :param job: Job.
+        :param status: New job status.
+        :param message: Event message.
+        :return:
+        """
+        with self._condition:
+            job.status = status
+            job.events.append({"job_id": job.job_id, "status": status, "message": message, "time": time.time()})
+            self._condition.notify_all()
+
+    def wait_for_events(self, job_id: str, since: int, timeout: float = 15) -> tuple[list, bool]:
+        """
+        Waits until the job has events newer than since or until it is finished.
+        :param job_id: Job id.
+        :param since: Number of events already received by the caller.
+        :param timeout: Maximum time to wait for new events.
+        :return: New events and whether the job has finished.
+        """
+        job = self.get_job(job_id)
+
+        with self._condition:
+            self._condition.wait_for(lambda: len(job.events) > since or job.status in JobStatus.FINAL, timeout)
+            return job.events[since:], job.status in JobStatus.FINAL
+
+    def _dispatch_loop(self):
+        while True:
+            with self._condition:
+                job = self._pop_runnable_job()
+                while job is None and not self._stopping:
+                    self._condition.wait()
+                    job = self._pop_runnable_job()
+
+                if self._stopping:
+                    return
+
+                self._running_jobs += 1
+                self._busy_ports.add(job.port)
+                if job.usb_hub is not None:
+                    self._hub_load[job.usb_hub] = self._hub_load.get(job.usb_hub, 0) + 1
+
+            threading.Thread(target=self._run_job, args=(job,), name=f"reset-{job.job_id[:8]}", daemon=True).start()
+
+    def _has_queued_job(self, port: str) -> bool:
+        """
+        Checks whether a queued job uses a port.
+        Must be called with the condition held.
+        :param port: Serial port.
+        :return: True if a queued job uses the port.
+        """
+        return any(entry[2].port == port for entry in self._queue)
+
+    def _pop_runnable_job(self) -> ResetJob | None:
+        """
+        Removes the highest priority job whose port and USB hub have free capacity from the queue.
+        Must be called with the condition held.
+        :return: Runnable job or None.
+        """
+        if self._running_jobs >= self.max_concurrent_jobs:
+            return None
+
+        for entry in sorted(self._queue):
+            job = entry[2]
+
+            if job.port in self._busy_ports:
+                continue
+            if job.usb_hub is not None and self._hub_load.get(job.usb_hub, 0) >= self.max_jobs_per_hub:
+                continue
+
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+            return job
+
+        return None
+
+    def _precompute_secret(self, job: ResetJob):
+        """
+        Starts hashing the job's enable secret in the process pool so it is ready when the job runs.
+        :param job: Job.
+        :return:
+        """
+        password_resetter = job.build_password_resetter()
+
+        if password_resetter.encrypt_enable_password and password_resetter.new_privileged_exec_mode_password:
+            self._secret_hasher.submit(password_resetter.new_privileged_exec_mode_password, password_resetter.enable_secret_type)
+
+    def _warm_up(self, port: str, baud_rate: int):
+        """
+        Opens the serial port of an idle queued job ahead of time so the job can start without waiting for the port.
+        The connection is only published once it is open, jobs for the port wait until then.
+        :param port: Serial port.
+        :param baud_rate: Baud rate.
+        :return:
+        """
+        if not self.keep_ports_warm:
+            return
+
+        with self._condition:
+            if self._stopping or port in self._busy_ports or port in self._warm_connections or port in self._warming_ports:
+                return
+            self._warming_ports.add(port)
+
+        serial_connection_manager = SerialConnectionManager()
+        serial_connection_manager.port = port
+        serial_connection_manager.baud_rate = baud_rate
+
+        try:
+            serial_connection_manager.open_serial_connection()
+        except Exception as e:
+            logger.warning("Could not warm up port %s: %s", port, e)
+            serial_connection_manager = None
+
+        with self._condition:
+            self._warming_ports.discard(port)
+            if serial_connection_manager is not None:
+                if self._stopping or not (self._has_queued_job(port) or port in self._busy_ports):
+                    serial_connection_manager.close_connection()
+                else:
+                    self._warm_connections[port] = serial_connection_manager
+            self._condition.notify_all()
+
+    def _acquire_connection(self, job: ResetJob) -> SerialConnectionManager:
+        """
+        Returns the warm connection of the job's port or opens a new one.
+        :param job: Job.
+        :return: Open serial connection manager.
+        """
+        with self._condition:
+            while job.port in self._warming_ports:
+                self._condition.wait()
+            serial_connection_manager = self._warm_connections.pop(job.port, None)
+
+        if serial_connection_manager is not None:
+            if serial_connection_manager.is_open and serial_connection_manager.baud_rate == job.baud_rate:
+                logger.debug("Reusing warm connection on %s", job.port)
+                return serial_connection_manager
+            serial_connection_manager.close_connection()
+
+        serial_connection_manager = SerialConnectionManager()
+        serial_connection_manager.port = job.port
+        serial_connection_manager.baud_rate = job.baud_rate
+        serial_connection_manager.open_serial_connection()
+        return serial_connection_manager
+
+    def _run_job(self, job: ResetJob):
+        job.started_at = time.time()
+        if job.timeout is not None:
+            job.cancellation_token.deadline = job.started_at + job.timeout
+        self.record_event(job, JobStatus.RUNNING, f"Started reset of {job.device.model} on {job.port}")
+        self._log_handler.attach(job)
+
+        serial_connection_manager = None
+        password_resetter = None
+        try:
+            serial_connection_manager = self._acquire_connection(job)
+            password_resetter = job.build_password_resetter()
+            password_resetter.secret_hasher = self._secret_hasher
+            password_resetter.boot_time_recorder = self.boot_time_recorder
+            if job.port in self.power_outlets:
+                password_resetter.power_controller, password_resetter.power_outlet = self.power_outlets[job.port]
+            password_resetter.reset_password(serial_connection_manager, job.device, job.cancellation_token)
+            job.console_traffic_report = password_resetter.console_traffic_report
+            job.boot_time_saved = password_resetter.boot_time_saved
+
+        except ResetCancelledException as e:
+            job.error = str(e)
+            logger.warning("Job %s cancelled: %s", job.job_id, e)
+            if serial_connection_manager is not None:
+                serial_connection_manager.close_connection()
+            final_status = JobStatus.CANCELLED
+
+        except Exception as e:
+            job.error = str(e)
+            logger.error("Job %s failed: %s", job.job_id, e)
+            if serial_connection_manager is not None:
+                serial_connection_manager.close_connection()
+            final_status = JobStatus.FAILED
+
+        else:
+            final_status = JobStatus.FINISHED
+
+        finally:
+            self._log_handler.detach()
+            job.finished_at = time.time()
+            if password_resetter is not None:
+                job.progress = password_resetter.progress
+            if serial_connection_manager is not None:
+                job.transcript = SerialConnectionManager.mask_secrets(serial_connection_manager.transcript)
+
+            with self._condition:
+                self._running_jobs -= 1
+                self._busy_ports.discard(job.port)
+                if job.usb_hub is not None:
+                    self._hub_load[job.usb_hub] -= 1
+                next_job = next((entry[2] for entry in sorted(self._queue) if entry[2].port == job.port), None)
+
+        self.record_event(job, final_status, job.error or "Reset finished")
+
+        if next_job is not None:
+            self._warm_up(next_job.port, next_job.baud_rate)
+
+
+class ResetDaemonRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP API of the reset daemon, also used by the coordinator when the daemon runs as an agent on a lab host.
+
+    POST   /jobs                        queue a job
+    GET    /jobs                        list jobs
+    GET    /jobs/<job_id>               job status
+    GET    /jobs/<job_id>/events        stream job events as JSON lines until the job finishes
+    GET    /jobs/<job_id>/transcript    console transcript of a finished job
+    DELETE /jobs/<job_id>               cancel a job
+    GET    /ports                       serial ports of this host served by the daemon
+    GET    /boot-times                  average normal and reduced boot time per device model
+
+    If the daemon has a token, every request must carry it in the X-Reset-Token header.
+    """
+
+    server: "ResetDaemon"
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+
+        path = self.path.rstrip("/").split("/")[1:]
+
+        try:
+            if path == ["ports"]:
+                self._send_json(200, self._list_ports())
+            elif path == ["boot-times"]:
+                self._send_json(200, self.server.scheduler.boot_time_recorder.report())
+            elif path == ["jobs"]:
+                self._send_json(200, [job.to_dict() for job in self.server.scheduler.list_jobs()])
+            elif len(path) == 2 and path[0] == "jobs":
+                self._send_json(200, self.server.scheduler.get_job(path[1]).to_dict())
+            elif len(path) == 3 and path[0] == "jobs" and path[2] == "events":
+                self._stream_events(path[1])
+            elif len(path) == 3 and path[0] == "jobs" and path[2] == "transcript":
+                self._send_text(200, self.server.scheduler.get_job(path[1]).transcript)
+            else:
+                self._send_json(404, {"error": "Not found"})
+
+        except JobNotFoundException as e:
+            self._send_json(404, {"error": str(e)})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+
+        if self.path.rstrip("/") != "/jobs":
+            self._send_json(404, {"error": "Not found"})
+            return
+
+        try:
+            content_length = int(self.headers.get("Content-Length", 0))
+            job = ResetJob.from_dict(json.loads(self.rfile.read(content_length)))
+        except Exception as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        if self.server.ports is not None and job.port not in self.server.ports:
+            self._send_json(400, {"error": f"Port {job.port} is not served by this daemon"})
+            return
+
+        self.server.scheduler.submit(job)
+        self._send_json(202, job.to_dict())
+
+    def do_DELETE(self):
+        if not self._authorized():
+            return
+
+        path = self.path.rstrip("/").split("/")[1:]
+
+        if len(path) != 2 or path[0] != "jobs":
+            self._send_json(404, {"error": "Not found"})
+            return
+
+        try:
+            self._send_json(202, self.server.scheduler.cancel(path[1]).to_dict())
+        except JobNotFoundException as e:
+            self._send_json(404, {"error": str(e)})
+
+    def _authorized(self) -> bool:
+        """
+        Checks the shared token of the request and answers 401 if it is missing or wrong.
+        :return: True if the request may be handled.
+        """
+        if self.server.token is None:
+            return True
+
+        token = self.headers.get(TOKEN_HEADER, "")
+        if hmac.compare_digest(token.encode(), self.server.token.encode()):
+            return True
+
+        self._send_json(401, {"error": "Missing or invalid token"})
+        return False
+
+    def _send_json(self, status: int, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_text(self, status: int, text: str):
+        body = text.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _list_ports(self) -> list:
+        return [
+            {"port": port_info.device, "description": port_info.description, "usb_hub": PortManager.get_usb_hub(port_info.device)}
+            for port_info in PortManager.list_ports()
+            if self.server.ports is None or port_info.device in self.server.ports
+        ]
+
+    def _stream_events(self, job_id: str):
+        scheduler = self.server.scheduler
+        scheduler.get_job(job_id)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+
+        sent_events = 0
+        finished = False
+        while not finished:
+            events, finished = scheduler.wait_for_events(job_id, sent_events)
+            for event in events:
+                self.wfile.write((json.dumps(event) + "\n").encode())
+            self.wfile.flush()
+            sent_events += len(events)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class ResetDaemon(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], scheduler: ResetScheduler, ports: list[str] | None = None, token: str | None = None):
+        super().__init__(address, ResetDaemonRequestHandler)
+        self.scheduler = scheduler
+        self.ports = set(ports) if ports is not None else None
+        self.token = token or None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local password reset daemon")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8750)
+    parser.add_argument("--max-jobs", type=int, default=4)
+    parser.add_argument("--max-jobs-per-hub", type=int, default=2)
+    parser.add_argument("--no-warm-ports", action="store_true")
+    parser.add_argument("--power-outlets", help="JSON file mapping serial ports to power controller outlets")
+    parser.add_argument("--ports", nargs="+", help="Serial ports this daemon advertises and accepts jobs for (default: all)")
+    parser.add_argument("--boot-times", default=DEFAULT_BOOT_TIMES_PATH, help="JSON file the measured boot times are kept in")
+    parser.add_argument("--token", default=os.environ.get(TOKEN_ENVIRONMENT_VARIABLE),
+                        help=f"Shared token every request must carry (default: ${TOKEN_ENVIRONMENT_VARIABLE})")
+    arguments = parser.parse_args()
+
+    outlet_map = PowerController.load_outlet_map(arguments.power_outlets) if arguments.power_outlets else None
+
+    reset_scheduler = ResetScheduler(arguments.max_jobs, arguments.max_jobs_per_hub, not arguments.no_warm_ports, outlet_map,
+                                     BootTimeRecorder(arguments.boot_times))
+    reset_scheduler.start()
+
+    daemon = ResetDaemon((arguments.host, arguments.port), reset_scheduler, arguments.ports, arguments.token)
+    if daemon.token is None and arguments.host not in ("127.0.0.1", "localhost", "::1"):
+        logger.warning("Listening on %s without a token, anyone who can reach the daemon can reset devices", arguments.host)
+    logger.info("Reset daemon listening on http://%s:%d", arguments.host, arguments.port)
+
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.server_close()
+        reset_scheduler.stop()
@@ -0,0 +1,171 @@
+import base64
+import hashlib
+import logging
+import secrets
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logging.basicConfig(stream=sys.stdout, level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger("secret_hasher")
+
+CISCO_BASE64_ALPHABET = "./0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+STANDARD_BASE64_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
+class SecretType:
+    MD5 = 5
+    PBKDF2_SHA256 = 8
+    SCRYPT = 9
+
+    ALL = (MD5, PBKDF2_SHA256, SCRYPT)
+
+class SaltPolicy:
+    SHARED = "SHARED"
+    UNIQUE = "UNIQUE"
+
+class SecretHasher:
+    """
+    Computes Cisco type 5, 8 and 9 secrets locally so the device receives the hashed form instead of the plaintext.
+    Secrets are computed in a process pool. With SaltPolicy.SHARED the secret of a password is computed once and reused
+    for every device, with SaltPolicy.UNIQUE every request gets a freshly salted secret. Failed computations are not
+    reused, a broken process pool is replaced.
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        self._max_workers = max_workers
+        self._executor = None
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def submit(self, password: str, secret_type: int, salt_policy: str = SaltPolicy.SHARED) -> Future:
+        """
+        Starts computing a secret in the process pool.
+        :param password: Plaintext password.
+        :param secret_type: Secret type, one of SecretType.
+        :param salt_policy: Salt policy, one of SaltPolicy.
+        :return: Future resolving to the secret.
+        """
+        cache_key = (password, secret_type, salt_policy)
+
+        with self._lock:
+            cached_future = self._cache.get(cache_key) if salt_policy == SaltPolicy.SHARED else None
+            if cached_future is not None and not SecretHasher._failed(cached_future):
+                return cached_future
+
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+
+            try:
+                future = self._executor.submit(SecretHasher.hash_secret, password, secret_type)
+            except BrokenProcessPool:
+                logger.warning("Secret hashing process pool is broken, replacing it")
+                self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+                future = self._executor.submit(SecretHasher.hash_secret, password, secret_type)
+
+            if salt_policy == SaltPolicy.SHARED:
+                self._cache[cache_key] = future
+
+        return future
+
+    @staticmethod
+    def _failed(future: Future) -> bool:
+        """
+        Checks whether a computation was cancelled or raised, so a cached secret is computed again instead of reused.
+        :param future: Cached computation.
+        :return: True if the computation finished without a secret.
+        """
+        return future.done() and (future.cancelled() or future.exception() is not None)
+
+    def get_secret(self, password: str, secret_type: int, salt_policy: str = SaltPolicy.SHARED) -> str:
+        """
+        Returns a secret, waiting for it to be computed if necessary.
+        :param password: Plaintext password.
+        :param secret_type: Secret type, one of SecretType.
+        :param salt_policy: Salt policy, one of SaltPolicy.
+        :return: Secret.
+        """
+        return self.submit(password, secret_type, salt_policy).result()
+
+    def shutdown(self):
+        """
+        Shuts down the process pool.
+        :return:
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+    @staticmethod
+    def hash_secret(password: str, secret_type: int, salt: str | None = None) -> str:
+        """
+        Computes a Cisco secret in the current process.
+        :param password: Plaintext password.
+        :param secret_type: Secret type, one of SecretType.
+        :param salt: Salt from the Cisco base64 alphabet (default: random).
+        :return: Secret as accepted by "enable secret <type> <secret>".
+        """
+        if secret_type == SecretType.MD5:
+            return SecretHasher._md5_crypt(password.encode(), (salt or SecretHasher._random_salt(4)).encode())
+
+        salt = salt or SecretHasher._random_salt(14)
+
+        if secret_type == SecretType.PBKDF2_SHA256:
+            digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), 20000)
+        elif secret_type == SecretType.SCRYPT:
+            digest = hashlib.scrypt(password.encode(), salt=salt.encode(), n=16384, r=1, p=1, dklen=32)
+        else:
+            raise ValueError(f"Unsupported secret type {secret_type}")
+
+        encoded_digest = base64.b64encode(digest).decode().translate(str.maketrans(STANDARD_BASE64_ALPHABET, CISCO_BASE64_ALPHABET))
+        return f"${secret_type}${salt}${encoded_digest.rstrip('=')}"
+
+    @staticmethod
+    def _random_salt(length: int) -> str:
+        return "".join(secrets.choice(CISCO_BASE64_ALPHABET) for _ in range(length))
+
+    @staticmethod
+    def _md5_crypt(password: bytes, salt: bytes) -> str:
+        """
+        MD5-crypt ($1$) as used by Cisco type 5 secrets.
+        :param password: Plaintext password.
+        :param salt: Salt of up to 8 characters.
+        :return: Secret.
+        """
+        salt = salt[:8]
+
+        alternate = hashlib.md5(password + salt + password).digest()
+        context = password + b"$1$" + salt
+        for remaining in range(len(password), 0, -16):
+            context += alternate[:min(16, remaining)]
+
+        length = len(password)
+        while length:
+            context += b"\x00" if length & 1 else password[:1]
+            length >>= 1
+
+        final = hashlib.md5(context).digest()
+        for round_number in range(1000):
+            round_context = password if round_number & 1 else final
+            if round_number % 3:
+                round_context += salt
+            if round_number % 7:
+                round_context += password
+            round_context += final if round_number & 1 else password
+            final = hashlib.md5(round_context).digest()
+
+        encoded_digest = ""
+        for first, second, third in ((0, 6, 12), (1, 7, 13), (2, 8, 14), (3, 9, 15), (4, 10, 5)):
+            encoded_digest += SecretHasher._encode_64(final[first] << 16 | final[second] << 8 | final[third], 4)
+        encoded_digest += SecretHasher._encode_64(final[11], 2)
+
+        return f"$1${salt.decode()}${encoded_digest}"
+
+    @staticmethod
+    def _encode_64(value: int, length: int) -> str:
+        encoded = ""
+        for _ in range(length):
+            encoded += CISCO_BASE64_ALPHABET[value & 0x3f]
+            value >>= 6
+        return encoded
@@ -1,16 +1,25 @@
 import sys
 import logging
 import time
+from collections.abc import Iterator
 from re import Pattern
 
 import serial
 from serial.serialutil import SerialException
 
-from utils.exceptions import IncorrectResponseException
+from utils.cancellation_token import CancellationToken
+from utils.cisco_devices import BootEnvironment
+from utils.exceptions import IncorrectResponseException, InterruptBootException
+from utils.response_patterns import ResponsePatterns
 
 logging.basicConfig(stream=sys.stdout, level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger("serial_connection")
 
+class WriteMode:
+    BULK = "BULK"
+    PACED = "PACED"
+    ECHO_CONFIRMED = "ECHO_CONFIRMED"
+
 class SerialConnectionManager:
 
     def __init__(self):
@@ -18,6 +27,33 @@ class SerialConnectionManager:
         self._baud_rate = None
         self._connection = None
 
+        self.auto_responses: dict[Pattern[str], str] = {ResponsePatterns.MORE: " "}
+        self.last_output = ""
+        self.transcript = ""
+        self.cancellation_token: CancellationToken | None = None
+
+        self.session_started_at = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.console_log_bytes_received = 0
+
+        self.write_mode = WriteMode.BULK
+        self.environment_write_modes = {
+            BootEnvironment.ROMMON: WriteMode.ECHO_CONFIRMED,
+            BootEnvironment.SWITCH_BOOTLOADER: WriteMode.ECHO_CONFIRMED,
+        }
+        self.target_environment: str | None = None
+        self.paced_chunk_size = 4
+        self.paced_chunk_delay = 0.01
+        self.echo_timeout = 0.5
+        self.echo_attempts = 4
+        self.max_echo_chunk_size = 64
+
+        self._echo_chunk_sizes = {}
+        self._clean_echo_lines = {}
+        self._echo_chunk_size_limits = {}
+        self._pending_input = ""
+
     @property
     def connection(self) -> serial.Serial:
         return self._connection
@@ -26,6 +62,10 @@ class SerialConnectionManager:
     def connection(self, connection: serial.Serial):
         self._connection = connection
 
+    @property
+    def is_open(self) -> bool:
+        return self._connection is not None and self._connection.is_open
+
     @property
     def port(self) -> str | None:
         return self._port
@@ -53,6 +93,7 @@ class SerialConnectionManager:
         """
         self._connection.reset_input_buffer()
         self._connection.reset_output_buffer()
+        self._pending_input = ""
 
 
     def open_serial_connection(self):
@@ -63,6 +104,7 @@ class SerialConnectionManager:
             self._connection = serial.Serial(port=self._port, baudrate=self._baud_rate)
 
             self._clear_buffer()
+            self.start_session()
 
             logger.info("Opened serial port %s @ %d bps", self._port, self._baud_rate)
 
@@ -71,6 +113,61 @@ class SerialConnectionManager:
         except Exception as e:
             raise Exception(e)
 
+    def start_session(self):
+        """
+        Resets the byte counters and the transcript, so they cover a session that starts now.
+        :return:
+        """
+        self.session_started_at = time.time()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.console_log_bytes_received = 0
+        self.transcript = ""
+
+    def _read_available(self, read_amount: int = 4096) -> str:
+        """
+        Reads the data currently waiting in the input buffer without blocking.
+        :param read_amount: Maximum number of bytes to read.
+        :return: Decoded data or an empty string if nothing is waiting.
+        """
+        if self.cancellation_token is not None:
+            self.cancellation_token.raise_if_cancelled()
+
+        if self._pending_input:
+            data, self._pending_input = self._pending_input, ""
+            return data
+
+        return self._read_from_connection(read_amount)
+
+    def _read_from_connection(self, read_amount: int = 4096) -> str:
+        """
+        Reads the data waiting in the serial input buffer, bypassing data already read while confirming echoes.
+        :param read_amount: Maximum number of bytes to read.
+        :return: Decoded data or an empty string if nothing is waiting.
+        """
+        bytes_waiting = self._connection.in_waiting
+
+        if bytes_waiting == 0:
+            return ""
+
+        data_bytes = self._connection.read(min(bytes_waiting, read_amount))
+        self.bytes_received += len(data_bytes)
+
+        data = data_bytes.decode('utf-8', errors='ignore')
+        self.transcript += data
+        return data
+
+    def _wait(self, seconds: float):
+        """
+        Sleeps between reads. Wakes up immediately and raises if the cancellation token is cancelled or expires.
+        :param seconds: Sleep duration.
+        :return:
+        """
+        if self.cancellation_token is not None:
+            self.cancellation_token.wait(seconds)
+        else:
+            time.sleep(seconds)
+
     def read_output(self, read_timeout: float = 5):
         """
         Read output from  serial connection until no output read for the duration of read_timeout.
@@ -80,18 +177,16 @@ class SerialConnectionManager:
         logger.info(f"Starting Read from serial port {self._port}")
 
         output = ""
-        read_amount = 4096
 
         last_data_time = time.time()
 
         while True:
-            bytes_waiting = self._connection.in_waiting
+            data = self._read_available()
 
-            if bytes_waiting > 0:
+            if data:
 
                 last_data_time = time.time()
-                data_bytes = self._connection.read(min(bytes_waiting, read_amount))
-                output += data_bytes.decode('utf-8', errors='ignore')
+                output += data
 
             else:
                 time_since_last_data = time.time() - last_data_time
@@ -100,35 +195,207 @@ class SerialConnectionManager:
                     logger.info("No data received for %s seconds, stopping read.", read_timeout)
                     break
 
-                time.sleep(0.1)
+                self._wait(0.1)
         logger.info("stopped read")
         return output
 
-    def read_until_expected_output(self, expected_response: Pattern[str], read_timeout: float = 5) -> bool:
+    def read_lines(self, read_timeout: float = 5, deadline: float | None = None, partial_line_timeout: float = 0.2) -> Iterator[str]:
         """
-        Reads output from the serial connection until there is no data read for the duration of read_timeout or until the expected response is received.
-        :param expected_response: Expected response.
+        Lazily yields lines from the serial connection as they arrive.
+        Complete lines are yielded without their line endings. Text without a line ending, such as a prompt or a progress
+        indicator, is yielded as a partial line once no new data arrives for partial_line_timeout, any text received
+        after that is yielded as a new line.
+        Iteration stops when no data is received for the duration of read_timeout or when the deadline passes.
+        :param read_timeout: Iteration stops if no new data is received from the device for this duration (default: 5s).
+        :param deadline: Absolute time (as returned by time.time()) after which iteration stops (default: no deadline).
+        :param partial_line_timeout: Silence after which an unterminated line is yielded (default: 0.2s).
+        :return: Iterator of received lines.
+        """
+        buffer = ""
+        poll_interval = 0.02
+
+        last_data_time = time.time()
+
+        while True:
+            data = self._read_available()
+            now = time.time()
+
+            if data:
+                last_data_time = now
+                buffer += data
+
+                *lines, buffer = buffer.split("\n")
+                for line in lines:
+                    yield line.strip("\r")
+
+            elif buffer and now - last_data_time >= partial_line_timeout:
+                yield buffer.strip("\r")
+                buffer = ""
+
+            elif now - last_data_time >= read_timeout:
+                logger.info("No data received for %s seconds, stopping read.", read_timeout)
+                break
+
+            if deadline is not None and now >= deadline:
+                logger.info("Read deadline reached, stopping read.")
+                break
+
+            if not data:
+                self._wait(poll_interval)
+
+        if buffer:
+            yield buffer.strip("\r")
+
+    def _write(self, data: str):
+        """
+        Writes data to the serial connection using the write mode of the target environment.
+        :param data: Data to write.
+        :return:
+        """
+        if self.cancellation_token is not None:
+            self.cancellation_token.raise_if_cancelled()
+
+        write_mode = self.environment_write_modes.get(self.target_environment, self.write_mode)
+
+        if write_mode == WriteMode.PACED:
+            self._write_paced(data)
+
+        elif write_mode == WriteMode.ECHO_CONFIRMED:
+            self._write_echo_confirmed(data)
+
+        else:
+            self._write_to_connection(data)
+
+    def _write_echo_confirmed(self, data: str):
+        """
+        Writes a line in chunks, waiting for the device to echo each chunk before sending the next, so bootloaders
+        without flow control don't drop characters. If an echo goes missing the line is erased with paced backspaces, so
+        the erase does not overrun the device as well, and resent in smaller chunks. After several clean lines the chunk
+        size for the target environment is doubled again, but never beyond the largest chunk size that has not failed in
+        that environment.
+        :param data: Data to write.
+        :return:
+        """
+        text = data.rstrip("\r\n")
+        line_ending = data[len(text):]
+
+        if not text.strip():
+            self._write_to_connection(data)
+            return
+
+        for _ in range(self.echo_attempts):
+            chunk_size = self._echo_chunk_sizes.get(self.target_environment, self.max_echo_chunk_size // 4)
+
+            if self._write_chunks_with_echo(text, chunk_size):
+                clean_echo_lines = self._clean_echo_lines.get(self.target_environment, 0) + 1
+                chunk_size_limit = self._echo_chunk_size_limits.get(self.target_environment, self.max_echo_chunk_size)
+
+                if clean_echo_lines >= 3 and chunk_size * 2 <= chunk_size_limit:
+                    chunk_size *= 2
+                    clean_echo_lines = 0
+                    logger.debug("Raised echo chunk size for %s to %d", self.target_environment, chunk_size)
+
+                self._echo_chunk_sizes[self.target_environment] = chunk_size
+                self._clean_echo_lines[self.target_environment] = clean_echo_lines
+                self._write_to_connection(line_ending)
+                return
+
+            logger.warning("Echo of %r incomplete with chunk size %d, resending", SerialConnectionManager.mask_secrets(text), chunk_size)
+            self._write_paced("\b" * len(text))
+            self._echo_chunk_sizes[self.target_environment] = max(1, chunk_size // 2)
+            self._echo_chunk_size_limits[self.target_environment] = max(1, chunk_size // 2)
+            self._clean_echo_lines[self.target_environment] = 0
+
+        raise IncorrectResponseException(f"Device did not echo {SerialConnectionManager.mask_secrets(text)!r} correctly.")
+
+    def _write_paced(self, data: str):
+        """
+        Writes data in chunks of paced_chunk_size with paced_chunk_delay between them.
+        :param data: Data to write.
+        :return:
+        """
+        for start in range(0, len(data), self.paced_chunk_size):
+            self._write_to_connection(data[start:start + self.paced_chunk_size])
+            self._wait(self.paced_chunk_delay)
+
+    def _write_chunks_with_echo(self, text: str, chunk_size: int) -> bool:
+        """
+        Writes text chunk by chunk, waiting up to echo_timeout for the echo of each chunk.
+        Everything read while waiting is kept for the next read.
+        :param text: Text to write.
+        :param chunk_size: Chunk size.
+        :return: True if every chunk was echoed.
+        """
+        for start in range(0, len(text), chunk_size):
+            chunk = text[start:start + chunk_size]
+            self._write_to_connection(chunk)
+
+            echo = ""
+            echo_deadline = time.time() + self.echo_timeout
+
+            while chunk not in echo:
+                data = self._read_from_connection()
+
+                if data:
+                    echo += data
+                    self._pending_input += data
+                elif time.time() >= echo_deadline:
+                    return False
+                else:
+                    self._wait(0.005)
+
+        return True
+
+    def _write_to_connection(self, data: str):
+        """
+        Writes data to the serial connection at once.
+        :param data: Data to write.
+        :return:
+        """
+        data_bytes = data.encode()
+        self._connection.write(data_bytes)
+        self.bytes_sent += len(data_bytes)
+
+    def expect(self, expected_responses: list[Pattern[str]], read_timeout: float = 5, auto_responses: dict[Pattern[str], str] | None = None) -> int:
+        """
+        Reads output from the serial connection until one of the expected responses matches.
+        Prompts matching an auto response pattern are answered as soon as they appear and reading continues, so
+        interactive dialogs are handled within a single wait.
+        :param expected_responses: Expected responses.
         :param read_timeout: Reading stops if no new data is received from the device for this duration (default: 5s).
-        :return: True if the expected response matches.
+        :param auto_responses: Auto responses for this wait, added to the standing auto_responses. Responses are written verbatim.
+        :return: Index of the matched expected response. The output read is stored in last_output.
         """
         logger.info(f"Starting Read from serial port {self._port}")
 
+        responders = {**self.auto_responses, **(auto_responses or {})}
         output = ""
-        read_amount = 4096
+        self.last_output = ""
 
         last_data_time = time.time()
 
         while True:
-            bytes_waiting = self._connection.in_waiting
+            data = self._read_available()
 
-            if bytes_waiting > 0:
+            if data:
 
                 last_data_time = time.time()
-                data_bytes = self._connection.read(min(bytes_waiting, read_amount))
-                output += data_bytes.decode('utf-8', errors='ignore')
+                output += data
+                self.last_output += data
+
+                for index, expected_response in enumerate(expected_responses):
+                    if expected_response.search(output):
+                        self._count_console_log_bytes()
+                        return index
 
-                if expected_response.search(output):
-                    return True
+                for prompt, response in responders.items():
+                    match = prompt.search(output)
+
+                    if match:
+                        logger.info("Answering %r with %r", match.group(0), SerialConnectionManager.mask_secrets(response))
+                        self._write(response)
+                        output = output[match.end():]
+                        break
 
             else:
                 time_since_last_data = time.time() - last_data_time
@@ -137,52 +404,104 @@ class SerialConnectionManager:
                     logger.info("No data received for %s seconds, stopping read.", read_timeout)
                     break
 
-                time.sleep(0.1)
-        logger.info("stopped read")
-        return False
+                self._wait(0.1)
 
+        self._count_console_log_bytes()
+        raise IncorrectResponseException("Incorrect response received from serial port.")
 
+    def _count_console_log_bytes(self):
+        """
+        Adds the size of unsolicited console log messages in last_output to console_log_bytes_received.
+        :return:
+        """
+        for log_message in ResponsePatterns.CONSOLE_LOG_MESSAGE.finditer(self.last_output):
+            self.console_log_bytes_received += len(log_message.group(0))
 
-    def send_command(self, command: str | None = None, expected_response: Pattern[str] | None = None, read_timeout: float = 5):
+    def send_command(self, command: str | None = None, expected_response: Pattern[str] | list[Pattern[str]] | None = None, read_timeout: float = 5,
+                     auto_responses: dict[Pattern[str], str] | None = None) -> int | None:
         """
         Sends data to the serial connection and checks if output matches the expected_response regex.
         :param read_timeout: Read timeout.
         :param command: Sent command.
-        :param expected_response: Expected response.
-        :return: True if the expected response matches.
+        :param expected_response: Expected response or list of possible expected responses.
+        :param auto_responses: Auto responses to interactive prompts while waiting for the expected response.
+        :return: Index of the matched expected response or None if no response was expected.
         """
 
         self._clear_buffer()
 
         command_to_send = command if command is not None else ""
 
-        logger.info(f"Sending command {command} to serial port {self._port}")
+        logger.info(f"Sending command {SerialConnectionManager.mask_secrets(command)} to serial port {self._port}")
+
+        self._write(command_to_send + '\n')
 
-        self._connection.write((command_to_send + '\n').encode())
+        matched_response = None
 
         if expected_response is not None:
-            is_response_correct = self.read_until_expected_output(expected_response, read_timeout)
+            expected_responses = expected_response if isinstance(expected_response, list) else [expected_response]
+            matched_response = self.expect(expected_responses, read_timeout, auto_responses)
+
+        logger.info(f"Successfully sent {SerialConnectionManager.mask_secrets(command)} to serial port {self._port}")
+
+        return matched_response
+
+
+    @staticmethod
+    def mask_secrets(text: str | None) -> str | None:
+        """
+        Replaces the arguments of password and secret commands, so commands and transcripts can be logged or served
+        without the passwords they contain.
+        :param text: Command or console output.
+        :return: Text with masked passwords and secrets.
+        """
+        if text is None:
+            return None
+        return ResponsePatterns.SECRET_ARGUMENT.sub(r"\g<prefix>********", text)
+
+    def interrupt_boot(self, bootloader_prompt: Pattern[str], break_window: float = 60, break_interval: float = 0.5):
+        """
+        Sends serial breaks while the device boots until the bootloader prompt appears.
+        Must be called right after the device is powered on.
+        :param bootloader_prompt: Prompt of the bootloader.
+        :param break_window: Time after power on during which the device accepts a break (default: 60s).
+        :param break_interval: Delay between breaks (default: 0.5s).
+        :return:
+        """
+        self._clear_buffer()
+
+        output = ""
+        deadline = time.time() + break_window
 
-            if not is_response_correct:
-                raise IncorrectResponseException("Incorrect response received from serial port.")
+        while time.time() < deadline:
+            self._connection.send_break(0.25)
+            self._wait(break_interval)
 
+            data = self._read_available()
+            while data:
+                output += data
+                data = self._read_available()
 
-        logger.info(f"Successfully sent {command} to serial port {self._port}")
+            if bootloader_prompt.search(output):
+                logger.info("Boot interrupted on serial port %s", self._port)
+                return
 
+        raise InterruptBootException(f"Bootloader prompt not reached within {break_window} seconds.")
 
     def close_connection(self):
         """
         Close the serial connection.
         :return:
         """
-        self._connection.close()
+        if self._connection is not None:
+            self._connection.close()
 
     def check_mode(self):
         """
         Sends an empty command to the serial connection then reads and returns the output.
         :return: Output from sending empty command.
         """
-        self._connection.write(b'\n')
-        time.sleep(0.1)
+        self._write('\n')
+        self._wait(0.1)
         mode = self.read_output(1.0)
         return mode
\ No newline at end of file
@@ -0,0 +1,62 @@
+from serial_connection_manager import SerialConnectionManager
+
+
+class FakeSerial:
+    """
+    Serial connection of a simulated device.
+    Every write is answered with its scripted reply. With echo_limit set, the first echo_limit bytes of every write are
+    echoed back and the rest is dropped, like a device without flow control. A break sent while the device boots drops
+    it into its bootloader.
+    """
+
+    def __init__(self, replies: dict[bytes, bytes] | None = None, echo_limit: int | None = None, bootloader_prompt: bytes = b"\r\nrommon 1 > "):
+        self.replies = replies if replies is not None else {}
+        self.echo_limit = echo_limit
+        self.bootloader_prompt = bootloader_prompt
+
+        self.is_open = True
+        self.booting = False
+        self.breaks = 0
+        self.written = []
+        self._output = b""
+
+    def boot(self, outlet: str | None = None):
+        self.booting = True
+        self._output += b"System Bootstrap, Version 16.7(4r), RELEASE SOFTWARE\r\n"
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self._output)
+
+    def read(self, size: int = 1) -> bytes:
+        data, self._output = self._output[:size], self._output[size:]
+        return data
+
+    def write(self, data: bytes) -> int:
+        self.written.append(data)
+        if self.echo_limit is not None:
+            self._output += data[:self.echo_limit]
+        self._output += self.replies.get(data, b"")
+        return len(data)
+
+    def send_break(self, duration: float = 0.25):
+        self.breaks += 1
+        if self.booting:
+            self.booting = False
+            self._output += self.bootloader_prompt
+
+    def reset_input_buffer(self):
+        self._output = b""
+
+    def reset_output_buffer(self):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+
+def create_connection(fake_serial: FakeSerial) -> SerialConnectionManager:
+    serial_connection_manager = SerialConnectionManager()
+    serial_connection_manager.port = "/dev/ttyFAKE0"
+    serial_connection_manager.connection = fake_serial
+    return serial_connection_manager
@@ -0,0 +1,60 @@
+import threading
+import time
+
+import pytest
+
+from boot_time_recorder import BootTimeRecorder
+from password_resetter import PasswordResetter
+from reset_daemon import JobStatus, ResetJob, ResetScheduler
+from serial_connection_manager import SerialConnectionManager
+from utils.cancellation_token import CancellationToken
+from utils.cisco_devices import Devices
+from utils.exceptions import DeadlineExceededException, ResetCancelledException
+
+from tests.conftest import FakeSerial, create_connection
+
+
+def test_cancel_while_waiting_for_the_device_closes_the_port():
+    console = FakeSerial()
+    cancellation_token = CancellationToken()
+    threading.Timer(0.2, cancellation_token.cancel, ["Job cancelled"]).start()
+
+    started_at = time.time()
+    with pytest.raises(ResetCancelledException, match="Job cancelled") as exception_info:
+        PasswordResetter().reset_password(create_connection(console), Devices.get_device("ISR 4321"), cancellation_token)
+
+    assert not isinstance(exception_info.value, DeadlineExceededException)
+    assert time.time() - started_at < 2
+    assert not console.is_open
+
+
+def test_expired_deadline_stops_the_reset():
+    console = FakeSerial()
+    password_resetter = PasswordResetter()
+    password_resetter.timeout = 0.2
+
+    with pytest.raises(DeadlineExceededException):
+        password_resetter.reset_password(create_connection(console), Devices.get_device("ISR 4321"))
+
+    assert not console.is_open
+
+
+def test_job_past_its_deadline_is_reported_cancelled(monkeypatch, tmp_path):
+    def open_serial_connection(serial_connection_manager):
+        serial_connection_manager.connection = FakeSerial()
+        serial_connection_manager.start_session()
+
+    monkeypatch.setattr(SerialConnectionManager, "open_serial_connection", open_serial_connection)
+
+    reset_scheduler = ResetScheduler(keep_ports_warm=False, boot_time_recorder=BootTimeRecorder(str(tmp_path / "boot_times.json")))
+    reset_scheduler.start()
+    try:
+        job = reset_scheduler.submit(ResetJob.from_dict({"port": "/dev/ttyFAKE0", "device": "ISR 4321", "timeout": 0.2}))
+        deadline = time.time() + 5
+        while job.status not in JobStatus.FINAL and time.time() < deadline:
+            reset_scheduler.wait_for_events(job.job_id, len(job.events), timeout=1)
+
+        assert job.status == JobStatus.CANCELLED
+        assert job.error == "Reset deadline exceeded"
+    finally:
+        reset_scheduler.stop()
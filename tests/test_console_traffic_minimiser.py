@@ -0,0 +1,57 @@
+from console_traffic_minimiser import ConsoleTrafficMinimiser
+from password_resetter import PasswordResetter
+from utils.configuration_commands import Commands
+
+from tests.conftest import FakeSerial, create_connection
+
+SHOW_LOGGING_CONSOLE = Commands.show_logging_console_setting.format(path=Commands.startup_config_path)
+
+
+def create_device(logging_console: bytes) -> FakeSerial:
+    return FakeSerial({
+        b"terminal length 0\n": b"terminal length 0\r\nRouter#",
+        SHOW_LOGGING_CONSOLE.encode() + b"\n": SHOW_LOGGING_CONSOLE.encode() + b"\r\n" + logging_console + b"Router#",
+        b"configure terminal\n": b"configure terminal\r\nEnter configuration commands, one per line.  End with CNTL/Z.\r\n(config)#",
+        b"no logging console\n": b"no logging console\r\n(config)#",
+        b"logging console informational\n": b"logging console informational\r\n(config)#",
+        b"end\n": b"end\r\nRouter#",
+        b"copy startup-config running-config\n": b"copy startup-config running-config\r\nDestination filename [running-config]? ",
+        b"\n": b"\r\n1234 bytes copied in 0.100 secs\r\n"
+               b"*Mar  1 00:10:00.000: %LINK-3-UPDOWN: Interface GigabitEthernet0/0/0, changed state to up\r\nRouter#",
+    })
+
+
+def test_logging_is_disabled_before_the_copy_and_restored():
+    fake_serial = create_device(b"logging console informational\r\n")
+    serial_connection_manager = create_connection(fake_serial)
+    console_traffic_minimiser = ConsoleTrafficMinimiser()
+
+    PasswordResetter._copy_config_to_running_config(serial_connection_manager, Commands.copy_startup_config_to_running_config,
+                                                    Commands.startup_config_path, console_traffic_minimiser)
+    serial_connection_manager.send_command(Commands.enter_global_configuration_mode)
+    report = console_traffic_minimiser.restore(serial_connection_manager)
+
+    assert fake_serial.written == [
+        b"terminal length 0\n", SHOW_LOGGING_CONSOLE.encode() + b"\n",
+        b"configure terminal\n", b"no logging console\n", b"end\n",
+        b"copy startup-config running-config\n", b"\n",
+        b"configure terminal\n", b"no logging console\n", b"end\n",
+        b"configure terminal\n",
+        b"logging console informational\n",
+    ]
+    assert report["overhead_bytes"] > 0
+
+
+def test_logging_already_disabled_is_left_alone():
+    fake_serial = create_device(b"no logging console\r\n")
+    serial_connection_manager = create_connection(fake_serial)
+    console_traffic_minimiser = ConsoleTrafficMinimiser()
+
+    PasswordResetter._copy_config_to_running_config(serial_connection_manager, Commands.copy_startup_config_to_running_config,
+                                                    Commands.startup_config_path, console_traffic_minimiser)
+    console_traffic_minimiser.restore(serial_connection_manager)
+
+    assert fake_serial.written == [
+        b"terminal length 0\n", SHOW_LOGGING_CONSOLE.encode() + b"\n",
+        b"copy startup-config running-config\n", b"\n",
+    ]
@@ -0,0 +1,66 @@
+import pytest
+
+from password_resetter import PasswordResetter
+
+ENVIRONMENT = "BAUD=9600\r\nBOOT=\r\nMAC_ADDR=00:11:22:33:44:55\r\nswitch: "
+IMAGE_DIRECTORY_LISTING = (
+    "Directory of flash:/\r\n\r\n"
+    "    2  -rwx         556   Mar 1 1993 00:02:21 +00:00  vlan.dat\r\n"
+    "    3  drwx         192   Mar 1 1993 00:04:53 +00:00  c2960-lanbasek9-mz.150-2.SE\r\n"
+)
+IOS_XE_LISTING = (
+    "dir flash:\r\n"
+    "Attributes        Size         Name\r\n"
+    "----------  ---------  --------------------------------\r\n"
+    "drwxr-xr-x       4096  .installer\r\n"
+    "-rw-r--r--       2097  vlan.dat\r\n"
+    "-rw-r--r--   27587556  cat9k-rpbase.17.09.04a.SPA.pkg\r\n"
+    "-rw-r--r--       9208  packages.conf\r\n"
+    "-rw-r--r--  1097512345  cat9k_iosxe.17.09.04a.SPA.bin\r\n"
+    "---------------------------------------------------\r\n"
+    "switch: "
+)
+IOS_XE_BUNDLE_LISTING = (
+    "dir flash:\r\n"
+    "Attributes        Size         Name\r\n"
+    "----------  ---------  --------------------------------\r\n"
+    "drwxr-xr-x       4096  .installer\r\n"
+    "-rw-r--r--       2097  vlan.dat\r\n"
+    "-rw-r--r--  1097512345  cat9k_iosxe.17.09.04a.SPA.bin\r\n"
+    "---------------------------------------------------\r\n"
+    "switch: "
+)
+IMAGE_LISTING = (
+    "Directory of flash:/c2960-lanbasek9-mz.150-2.SE/\r\n\r\n"
+    "    4  -rwx    11832064   Mar 1 1993 00:04:53 +00:00  c2960-lanbasek9-mz.150-2.SE.bin\r\n"
+)
+
+
+class FakeBootloader:
+    """
+    Serial connection manager stub that answers bootloader commands with canned output.
+    """
+
+    def __init__(self, outputs: dict[str, str]):
+        self.outputs = outputs
+        self.commands = []
+        self.last_output = ""
+
+    def send_command(self, command, expected_response=None, read_timeout=5, auto_responses=None):
+        self.commands.append(command)
+        self.last_output = self.outputs.get(command, "")
+
+
+@pytest.mark.parametrize("outputs, boot_image", [
+    ({"set": ENVIRONMENT, "dir flash:": IMAGE_DIRECTORY_LISTING, "dir flash:c2960-lanbasek9-mz.150-2.SE/": IMAGE_LISTING},
+     "flash:c2960-lanbasek9-mz.150-2.SE/c2960-lanbasek9-mz.150-2.SE.bin"),
+    ({"set": ENVIRONMENT, "dir flash:": IOS_XE_LISTING}, "flash:packages.conf"),
+    ({"set": ENVIRONMENT, "dir flash:": IOS_XE_BUNDLE_LISTING}, "flash:cat9k_iosxe.17.09.04a.SPA.bin"),
+    ({"set": "BOOT=flash:c2960-lanbasek9-mz.150-2.SE.bin\r\n"}, None),
+    ({"set": ENVIRONMENT, "dir flash:": "    5  -rwx  1234   Mar 1 1993 00:04:53 +00:00  c2960-lanbasek9-mz.150-2.SE.bin\r\n"
+                                        "    6  -rwx  1234   Mar 1 1993 00:04:53 +00:00  c2960-lanbasek9-mz.152-7.E.bin\r\n"},
+     None),
+    ({"set": ENVIRONMENT, "dir flash:": "    2  -rwx         556   Mar 1 1993 00:02:21 +00:00  vlan.dat\r\n"}, None),
+])
+def test_select_boot_image(outputs, boot_image):
+    assert PasswordResetter._select_boot_image(FakeBootloader(outputs)) == boot_image
@@ -0,0 +1,52 @@
+import pytest
+
+from power_controller import SimulatedPowerController
+from utils.cancellation_token import CancellationToken
+from utils.exceptions import PowerControllerException, ResetCancelledException
+
+
+class FlakyPowerController(SimulatedPowerController):
+    """
+    Simulated power controller that fails to turn outlets on the first failures times.
+    """
+
+    power_on_retry_delay = 0
+
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+
+    def power_on(self, outlet: str):
+        if self.failures:
+            self.failures -= 1
+            raise PowerControllerException("PDU did not answer")
+        super().power_on(outlet)
+
+
+def test_cancelled_power_cycle_turns_the_outlet_back_on():
+    power_controller = SimulatedPowerController()
+    cancellation_token = CancellationToken()
+    cancellation_token.cancel()
+
+    with pytest.raises(ResetCancelledException):
+        power_controller.power_cycle("1", 5, cancellation_token)
+
+    assert [event[2] for event in power_controller.events] == ["off", "on"]
+    assert power_controller.outlet_states["1"]
+
+
+def test_power_on_is_retried():
+    power_controller = FlakyPowerController(failures=2)
+
+    power_controller.power_cycle("1")
+
+    assert power_controller.outlet_states["1"]
+
+
+def test_power_on_failure_is_raised_after_the_last_attempt():
+    power_controller = FlakyPowerController(failures=3)
+
+    with pytest.raises(PowerControllerException):
+        power_controller.power_cycle("1")
+
+    assert not power_controller.outlet_states["1"]
@@ -0,0 +1,88 @@
+import pytest
+
+from password_resetter import PasswordResetter
+from power_controller import SimulatedPowerController
+from utils.cisco_devices import Devices
+from utils.exceptions import IncorrectResponseException
+
+from tests.conftest import FakeSerial, create_connection
+
+
+def create_resetter(console: FakeSerial, reset_results: list) -> tuple[PasswordResetter, SimulatedPowerController]:
+    """
+    Creates a password resetter with a simulated power controller. The reset itself is replaced by a stub that raises
+    the next exception of reset_results, or succeeds once they are used up.
+    """
+    power_controller = SimulatedPowerController(on_power_on=console.boot)
+
+    password_resetter = PasswordResetter()
+    password_resetter.power_controller = power_controller
+    password_resetter.power_outlet = "1"
+    password_resetter.power_off_duration = 0
+
+    def reset_password(serial_connection_manager, device):
+        password_resetter.progress.append("Reset")
+        if reset_results:
+            raise reset_results.pop(0)
+
+    password_resetter._reset_password = reset_password
+    return password_resetter, power_controller
+
+
+def test_router_is_power_cycled_into_rommon():
+    console = FakeSerial()
+    password_resetter, power_controller = create_resetter(console, [])
+
+    password_resetter.reset_password(create_connection(console), Devices.get_device("ISR 4321"))
+
+    assert [event[2] for event in power_controller.events] == ["off", "on"]
+    assert console.breaks == 1
+    assert password_resetter.progress == ["Power cycled into bootloader", "Reset"]
+
+
+def test_router_that_stops_responding_is_power_cycled_again():
+    console = FakeSerial()
+    password_resetter, power_controller = create_resetter(console, [IncorrectResponseException("No prompt")])
+
+    password_resetter.reset_password(create_connection(console), Devices.get_device("ISR 4321"))
+
+    assert [event[2] for event in power_controller.events] == ["off", "on", "off", "on"]
+    assert password_resetter.progress == ["Power cycled into bootloader", "Reset", "Power cycled to recover", "Power cycled into bootloader", "Reset"]
+
+
+def test_recovery_gives_up_after_recovery_attempts():
+    console = FakeSerial()
+    password_resetter, power_controller = create_resetter(console, [IncorrectResponseException("No prompt")] * 2)
+
+    with pytest.raises(IncorrectResponseException):
+        password_resetter.reset_password(create_connection(console), Devices.get_device("ISR 4321"))
+
+    assert [event[2] for event in power_controller.events] == ["off", "on", "off", "on"]
+
+
+def test_failure_after_the_configuration_is_saved_is_not_retried():
+    console = FakeSerial()
+    password_resetter, power_controller = create_resetter(console, [])
+
+    def reset_password(serial_connection_manager, device):
+        password_resetter.configuration_saved = True
+        raise IncorrectResponseException("No prompt")
+
+    password_resetter._reset_password = reset_password
+
+    with pytest.raises(IncorrectResponseException):
+        password_resetter.reset_password(create_connection(console), Devices.get_device("ISR 4321"))
+
+    assert [event[2] for event in power_controller.events] == ["off", "on"]
+
+
+def test_switch_is_not_power_cycled():
+    console = FakeSerial()
+    password_resetter, power_controller = create_resetter(console, [IncorrectResponseException("No prompt")])
+
+    with pytest.raises(IncorrectResponseException):
+        password_resetter.reset_password(create_connection(console), Devices.get_device("Catalyst 2960"))
+
+    assert power_controller.events == []
+    assert console.breaks == 0
+    assert password_resetter.progress == ["Reset"]
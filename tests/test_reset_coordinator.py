@@ -0,0 +1,118 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from types import SimpleNamespace
+
+import pytest
+
+from boot_time_recorder import BootTimeRecorder
+from port_manager import PortManager
+from reset_coordinator import ResetCoordinator
+from reset_daemon import ResetDaemon, ResetScheduler
+from utils.exceptions import SelectionError
+
+HOST_PORTS = ["/dev/ttyFAKE0", "/dev/ttyFAKE1"]
+
+
+@pytest.fixture
+def start_agent(monkeypatch, tmp_path):
+    """
+    Starts reset daemons on localhost whose schedulers queue jobs without running them.
+    """
+    monkeypatch.setattr(PortManager, "list_ports", staticmethod(
+        lambda: [SimpleNamespace(device=port, description="Fake console") for port in HOST_PORTS]
+    ))
+    daemons = []
+
+    def start(ports: list[str] | None = None, token: str | None = None) -> tuple[str, ResetDaemon]:
+        scheduler = ResetScheduler(keep_ports_warm=False, boot_time_recorder=BootTimeRecorder(str(tmp_path / "boot_times.json")))
+        daemon = ResetDaemon(("127.0.0.1", 0), scheduler, ports, token)
+        threading.Thread(target=daemon.serve_forever, daemon=True).start()
+        daemons.append(daemon)
+        return f"http://127.0.0.1:{daemon.server_address[1]}", daemon
+
+    yield start
+
+    for daemon in daemons:
+        daemon.shutdown()
+        daemon.server_close()
+        daemon.scheduler.stop()
+
+
+def test_jobs_are_sent_to_the_agent_serving_their_port(start_agent):
+    first_agent_url, first_agent = start_agent(["/dev/ttyFAKE0"])
+    second_agent_url, second_agent = start_agent(["/dev/ttyFAKE1"])
+
+    coordinator = ResetCoordinator([first_agent_url, second_agent_url])
+    assert coordinator.refresh_ports() == {first_agent_url: ["/dev/ttyFAKE0"], second_agent_url: ["/dev/ttyFAKE1"]}
+
+    first_job = coordinator.submit({"port": "/dev/ttyFAKE0", "device": "ISR 4321"})
+    second_job = coordinator.submit({"port": "/dev/ttyFAKE1", "device": "Catalyst 2960"})
+
+    assert first_job["agent"] == first_agent_url
+    assert second_job["agent"] == second_agent_url
+    assert [job.job_id for job in first_agent.scheduler.list_jobs()] == [first_job["job_id"]]
+    assert [job.job_id for job in second_agent.scheduler.list_jobs()] == [second_job["job_id"]]
+
+    first_agent.scheduler.cancel(first_job["job_id"])
+    second_agent.scheduler.cancel(second_job["job_id"])
+
+    results = coordinator.wait_for_results(poll_interval=0.1, timeout=5)
+    assert sorted((result["agent"], result["status"]) for result in results) == sorted(
+        [(first_agent_url, "CANCELLED"), (second_agent_url, "CANCELLED")]
+    )
+    assert all(result["transcript"] == "" for result in results)
+
+
+def test_port_advertised_by_several_agents_needs_a_pinned_agent(start_agent):
+    first_agent_url, first_agent = start_agent()
+    second_agent_url, second_agent = start_agent()
+
+    coordinator = ResetCoordinator([first_agent_url, second_agent_url])
+
+    with pytest.raises(SelectionError):
+        coordinator.submit({"port": "/dev/ttyFAKE0", "device": "ISR 4321"})
+
+    job = coordinator.submit({"port": "/dev/ttyFAKE0", "device": "ISR 4321", "agent": second_agent_url})
+
+    assert job["agent"] == second_agent_url
+    assert first_agent.scheduler.list_jobs() == []
+
+
+def test_unknown_port_is_rejected(start_agent):
+    agent_url, _ = start_agent(["/dev/ttyFAKE0"])
+
+    coordinator = ResetCoordinator([agent_url])
+
+    with pytest.raises(SelectionError):
+        coordinator.submit({"port": "/dev/ttyFAKE1", "device": "ISR 4321"})
+
+
+def test_agent_rejects_jobs_for_ports_it_does_not_serve(start_agent):
+    agent_url, agent = start_agent(["/dev/ttyFAKE0"])
+
+    request = urllib.request.Request(agent_url + "/jobs", data=json.dumps({"port": "/dev/ttyFAKE1", "device": "ISR 4321"}).encode(), method="POST")
+
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(request, timeout=5)
+
+    assert error.value.code == 400
+    assert agent.scheduler.list_jobs() == []
+
+
+def test_agent_with_a_token_rejects_requests_without_it(start_agent):
+    agent_url, agent = start_agent(token="lab-token")
+
+    with pytest.raises(urllib.error.HTTPError) as exception_info:
+        urllib.request.urlopen(agent_url + "/ports", timeout=5)
+    assert exception_info.value.code == 401
+
+    assert ResetCoordinator([agent_url], token="wrong-token").refresh_ports() == {agent_url: []}
+
+    coordinator = ResetCoordinator([agent_url], token="lab-token")
+    assert coordinator.refresh_ports() == {agent_url: HOST_PORTS}
+    job = coordinator.submit({"port": "/dev/ttyFAKE0", "device": "ISR 4321"})
+    assert [queued_job.job_id for queued_job in agent.scheduler.list_jobs()] == [job["job_id"]]
+
+    agent.scheduler.cancel(job["job_id"])
@@ -0,0 +1,71 @@
+import logging
+
+import pytest
+
+from boot_time_recorder import BootTimeRecorder
+from reset_daemon import JOB_LOGGER_NAMES, ResetJob, ResetScheduler
+from serial_connection_manager import SerialConnectionManager
+
+from tests.conftest import FakeSerial
+
+
+@pytest.fixture
+def scheduler(monkeypatch, tmp_path):
+    """
+    Scheduler that is not started, so jobs stay queued, with ports opened on fake serial connections.
+    """
+    def open_serial_connection(serial_connection_manager):
+        serial_connection_manager.connection = FakeSerial()
+        serial_connection_manager.start_session()
+
+    monkeypatch.setattr(SerialConnectionManager, "open_serial_connection", open_serial_connection)
+
+    reset_scheduler = ResetScheduler(boot_time_recorder=BootTimeRecorder(str(tmp_path / "boot_times.json")))
+    yield reset_scheduler
+    reset_scheduler.stop()
+
+
+@pytest.mark.parametrize("options", [
+    ["a"],
+    {"new_privileged_exec_mode_password": 1234},
+    {"new_line_console_password": ["secret"]},
+    {"enable_secret_type": 7},
+    {"enable_secret_type": "md5"},
+])
+def test_invalid_options_are_rejected(options):
+    with pytest.raises((TypeError, ValueError)):
+        ResetJob.from_dict({"port": "/dev/ttyFAKE0", "device": "ISR 4321", "options": options})
+
+
+def test_valid_options_are_accepted():
+    job = ResetJob.from_dict({
+        "port": "/dev/ttyFAKE0",
+        "device": "ISR 4321",
+        "options": {"new_privileged_exec_mode_password": "cisco", "encrypt_enable_password": True, "enable_secret_type": 9,
+                    "minimise_console_traffic": True},
+    })
+    password_resetter = job.build_password_resetter()
+
+    assert password_resetter.enable_secret_type == 9
+    assert password_resetter.minimise_console_traffic
+
+
+def test_stop_removes_the_job_log_handlers():
+    handler_counts = [len(logging.getLogger(logger_name).handlers) for logger_name in JOB_LOGGER_NAMES]
+
+    ResetScheduler(keep_ports_warm=False).stop()
+
+    assert [len(logging.getLogger(logger_name).handlers) for logger_name in JOB_LOGGER_NAMES] == handler_counts
+
+
+def test_cancelling_the_last_queued_job_of_a_port_closes_its_warm_connection(scheduler):
+    first_job = scheduler.submit(ResetJob.from_dict({"port": "/dev/ttyFAKE0", "device": "ISR 4321"}))
+    second_job = scheduler.submit(ResetJob.from_dict({"port": "/dev/ttyFAKE0", "device": "ISR 4321"}))
+    warm_connection = scheduler._warm_connections["/dev/ttyFAKE0"]
+
+    scheduler.cancel(first_job.job_id)
+    assert warm_connection.is_open
+
+    scheduler.cancel(second_job.job_id)
+    assert not warm_connection.is_open
+    assert "/dev/ttyFAKE0" not in scheduler._warm_connections
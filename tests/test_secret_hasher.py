@@ -0,0 +1,36 @@
+import warnings
+
+import pytest
+
+from secret_hasher import SecretHasher, SecretType
+
+
+@pytest.mark.parametrize("secret_type, salt, secret", [
+    (SecretType.MD5, "28772684", "$1$28772684$iEwNOgGugqO9.bIz5sk8k/"),
+    (SecretType.PBKDF2_SHA256, "TnGX/fE4KGHOVU", "$8$TnGX/fE4KGHOVU$pEhnEvxrvaynpi8j4f.EMHr6M.FzU8xnZnBr/tJdFWk"),
+    (SecretType.SCRYPT, "2MJBozw/9R3UsU", "$9$2MJBozw/9R3UsU$2lFhcKvpghcyw8deP25GOfyZaagyUOGBymkryvOdfo6"),
+])
+def test_hash_secret_known_answers(secret_type, salt, secret):
+    assert SecretHasher.hash_secret("hashcat", secret_type, salt) == secret
+
+
+@pytest.mark.parametrize("password, salt", [("cisco", "mERr"), ("a much longer password than sixteen bytes", "Ab3./xyZ")])
+def test_md5_secret_matches_crypt(password, salt):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        crypt = pytest.importorskip("crypt")
+
+    assert SecretHasher.hash_secret(password, SecretType.MD5, salt) == crypt.crypt(password, f"$1${salt}$")
+
+
+def test_failed_shared_secret_is_not_reused():
+    secret_hasher = SecretHasher()
+
+    try:
+        failed_future = secret_hasher.submit("cisco", 7)
+        with pytest.raises(ValueError):
+            failed_future.result()
+
+        assert secret_hasher.submit("cisco", 7) is not failed_future
+    finally:
+        secret_hasher.shutdown()
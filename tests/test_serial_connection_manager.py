@@ -0,0 +1,62 @@
+import pytest
+
+from serial_connection_manager import SerialConnectionManager
+from utils.cisco_devices import BootEnvironment
+from utils.configuration_commands import Commands
+from utils.exceptions import IncorrectResponseException
+from utils.response_patterns import ResponsePatterns
+
+from tests.conftest import FakeSerial, create_connection
+
+
+def test_mask_secrets_hides_password_arguments():
+    assert SerialConnectionManager.mask_secrets("enable password p@ss word") == "enable password ********"
+    assert SerialConnectionManager.mask_secrets("enable secret 9 $9$salt$hash") == "enable secret 9 ********"
+    assert SerialConnectionManager.mask_secrets("Switch(config-line)#password abc\r\nSwitch(config-line)#") == "Switch(config-line)#password ********\r\nSwitch(config-line)#"
+
+
+def test_mask_secrets_keeps_commands_without_arguments():
+    assert SerialConnectionManager.mask_secrets("no enable password") == "no enable password"
+    assert SerialConnectionManager.mask_secrets("Password: ") == "Password: "
+    assert SerialConnectionManager.mask_secrets(None) is None
+
+
+def test_reload_prompts_are_answered_within_one_wait():
+    console = FakeSerial({
+        b"reload\n": b"reload\r\nSystem configuration has been modified. Save? [yes/no]: ",
+        b"no\n": b"no\r\nProceed with reload? [confirm]",
+        b"\n": b"\r\n*Mar  1 00:10:00.000: %SYS-5-RELOAD: Reload requested by console. Reload Reason: Reload Command.\r\n",
+    })
+    serial_connection_manager = create_connection(console)
+
+    matched_response = serial_connection_manager.send_command(Commands.reload, ResponsePatterns.RELOAD_STARTED, 1,
+                                                              auto_responses={ResponsePatterns.SAVE_MODIFIED_CONFIGURATION: Commands.no + "\n",
+                                                                              ResponsePatterns.CONFIRM: "\n"})
+
+    assert matched_response == 0
+    assert console.written == [b"reload\n", b"no\n", b"\n"]
+
+
+def test_echo_failure_erases_line_without_overrunning_the_device():
+    console = FakeSerial(echo_limit=8)
+    serial_connection_manager = create_connection(console)
+    serial_connection_manager.target_environment = BootEnvironment.ROMMON
+    serial_connection_manager.echo_timeout = 0.05
+
+    serial_connection_manager._write("confreg 0x2142\n")
+
+    erase_writes = [data for data in console.written if b"\b" in data]
+    assert b"".join(erase_writes) == b"\b" * len("confreg 0x2142")
+    assert all(len(data) <= console.echo_limit for data in erase_writes)
+    assert console.written[-1] == b"\n"
+
+
+def test_echo_failure_does_not_reveal_the_secret():
+    serial_connection_manager = create_connection(FakeSerial(echo_limit=0))
+    serial_connection_manager.target_environment = BootEnvironment.ROMMON
+    serial_connection_manager.echo_timeout = 0.05
+
+    with pytest.raises(IncorrectResponseException) as exception_info:
+        serial_connection_manager._write("enable secret cisco\n")
+
+    assert "cisco" not in str(exception_info.value)
@@ -0,0 +1,49 @@
+import threading
+import time
+
+from utils.exceptions import ResetCancelledException, DeadlineExceededException
+
+class CancellationToken:
+    """
+    Cooperative cancellation signal with an optional overall deadline, shared between a reset and whoever controls it.
+    """
+
+    def __init__(self, timeout: float | None = None):
+        self._cancelled = threading.Event()
+        self.reason = None
+        self.deadline = time.time() + timeout if timeout is not None else None
+
+    @property
+    def deadline_exceeded(self) -> bool:
+        return self.deadline is not None and time.time() >= self.deadline
+
+    def cancel(self, reason: str = "Reset cancelled"):
+        """
+        Requests cancellation. Waits using this token return immediately.
+        :param reason: Reason reported by the raised exception.
+        :return:
+        """
+        self.reason = reason
+        self._cancelled.set()
+
+    def raise_if_cancelled(self):
+        """
+        Raises if cancellation was requested or the deadline has passed.
+        :return:
+        """
+        if self._cancelled.is_set():
+            raise ResetCancelledException(self.reason)
+        if self.deadline_exceeded:
+            raise DeadlineExceededException("Reset deadline exceeded")
+
+    def wait(self, seconds: float):
+        """
+        Sleeps for the given duration, returning early and raising if the token is cancelled or the deadline passes.
+        :param seconds: Sleep duration.
+        :return:
+        """
+        if self.deadline is not None:
+            seconds = max(0.0, min(seconds, self.deadline - time.time()))
+
+        self._cancelled.wait(seconds)
+        self.raise_if_cancelled()
@@ -1,28 +1,54 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from utils.exceptions import SelectionError
 
 class BootEnvironment:
     ROMMON = "ROMMON"
     SWITCH_BOOTLOADER = "SWITCH_BOOTLOADER"
 
+class DeviceCapability:
+    # Bootloader supports SWITCH_IGNORE_STARTUP_CFG=1, so config.text does not have to be renamed and copied back.
+    IGNORE_STARTUP_CONFIG_VARIABLE = "IGNORE_STARTUP_CONFIG_VARIABLE"
+    # A serial break during the first minute of boot drops into the bootloader, no button press is needed.
+    BREAK_INTERRUPTS_BOOT = "BREAK_INTERRUPTS_BOOT"
+
 @dataclass(frozen=True)
 class Device:
     model: str
     device: str
     boot_environment: str
+    capabilities: frozenset[str] = field(default_factory=frozenset)
 
 
 class Devices:
     devices = [
-        Device("ISR 4321", "Router", BootEnvironment.ROMMON),
-        Device("ISR 4331", "Router", BootEnvironment.ROMMON),
-        Device("ISR 4351", "Router", BootEnvironment.ROMMON),
-        Device("ASR 1001-X", "Router", BootEnvironment.ROMMON),
-        Device("ASR 1002-X", "Router", BootEnvironment.ROMMON),
+        Device("ISR 4321", "Router", BootEnvironment.ROMMON, frozenset({DeviceCapability.BREAK_INTERRUPTS_BOOT})),
+        Device("ISR 4331", "Router", BootEnvironment.ROMMON, frozenset({DeviceCapability.BREAK_INTERRUPTS_BOOT})),
+        Device("ISR 4351", "Router", BootEnvironment.ROMMON, frozenset({DeviceCapability.BREAK_INTERRUPTS_BOOT})),
+        Device("ASR 1001-X", "Router", BootEnvironment.ROMMON, frozenset({DeviceCapability.BREAK_INTERRUPTS_BOOT})),
+        Device("ASR 1002-X", "Router", BootEnvironment.ROMMON, frozenset({DeviceCapability.BREAK_INTERRUPTS_BOOT})),
 
         Device("Catalyst 2950", "Switch", BootEnvironment.SWITCH_BOOTLOADER),
         Device("Catalyst 2960", "Switch", BootEnvironment.SWITCH_BOOTLOADER),
         Device("Catalyst 2960X", "Switch", BootEnvironment.SWITCH_BOOTLOADER),
         Device("Catalyst 3560", "Switch", BootEnvironment.SWITCH_BOOTLOADER),
-        Device("Catalyst 3750", "Switch", BootEnvironment.SWITCH_BOOTLOADER)
+        Device("Catalyst 3750", "Switch", BootEnvironment.SWITCH_BOOTLOADER),
+
+        Device("Catalyst 3650", "Switch", BootEnvironment.SWITCH_BOOTLOADER, frozenset({DeviceCapability.IGNORE_STARTUP_CONFIG_VARIABLE})),
+        Device("Catalyst 3850", "Switch", BootEnvironment.SWITCH_BOOTLOADER, frozenset({DeviceCapability.IGNORE_STARTUP_CONFIG_VARIABLE})),
+        Device("Catalyst 9200", "Switch", BootEnvironment.SWITCH_BOOTLOADER, frozenset({DeviceCapability.IGNORE_STARTUP_CONFIG_VARIABLE})),
+        Device("Catalyst 9300", "Switch", BootEnvironment.SWITCH_BOOTLOADER, frozenset({DeviceCapability.IGNORE_STARTUP_CONFIG_VARIABLE})),
+        Device("Catalyst 9500", "Switch", BootEnvironment.SWITCH_BOOTLOADER, frozenset({DeviceCapability.IGNORE_STARTUP_CONFIG_VARIABLE}))
     ]
 
+    @staticmethod
+    def get_device(model: str) -> Device:
+        """
+        Finds a device in the catalog by its model name.
+        :param model: Device model.
+        :return: Matching device.
+        """
+        for device in Devices.devices:
+            if device.model == model:
+                return device
+        raise SelectionError(f"Unknown device model {model}")
\ No newline at end of file
@@ -15,7 +15,7 @@ class Commands:
 
     set_enable_password = "enable password {password}"
 
-    set_enable_secret_password = "enable secret password {password}"
+    set_enable_secret_hash = "enable secret {secret_type} {secret}"
 
     enter_line_console = "line console 0"
 
@@ -33,6 +33,10 @@ class Commands:
 
     copy_startup_config_to_running_config = "copy startup-config running-config"
 
+    startup_config_path = "nvram:startup-config"
+
+    config_file_path = "flash:config.txt"
+
     copy_running_config_to_startup_config = "copy running-config startup-config"
 
     enter_global_configuration_mode = "configure terminal"
@@ -45,6 +49,16 @@ class Commands:
 
     yes = "yes"
 
+    disable_paging = "terminal length 0"
+
+    show_logging_console_setting = "more {path} | include ^(no )?logging console"
+
+    disable_logging_console = "no logging console"
+
+    enable_logging_console = "logging console"
+
+    stop_ignoring_startup_config = "no system ignore startupconfig switch all"
+
 class RouterCommands(Commands):
     pass
 
@@ -62,4 +76,12 @@ class SwitchBootloaderCommands:
 
     rename_startup_config = "rename flash:config.text flash:config.old"
 
-    boot = 'boot'
\ No newline at end of file
+    ignore_startup_config = "SWITCH_IGNORE_STARTUP_CFG=1"
+
+    boot = 'boot'
+
+    boot_image = "boot {image}"
+
+    show_environment = "set"
+
+    list_directory = "dir {directory}"
\ No newline at end of file
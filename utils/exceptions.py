@@ -5,4 +5,19 @@ class InterruptBootException(Exception):
     pass
 
 class IncorrectResponseException(Exception):
+    pass
+
+class SelectionError(Exception):
+    pass
+
+class JobNotFoundException(Exception):
+    pass
+
+class ResetCancelledException(Exception):
+    pass
+
+class DeadlineExceededException(ResetCancelledException):
+    pass
+
+class PowerControllerException(Exception):
     pass
\ No newline at end of file
@@ -23,4 +23,20 @@ class ResponsePatterns:
 
     DESTINATION_FILE_RENAME = re.compile(r'Destination\s+filename\s*\[[^\]]*\]\s*\?', re.MULTILINE | re.IGNORECASE)
 
-    PROCEED_WITH_RELOAD = re.compile(r'Proceed\s+with\s+reload\??', re.IGNORECASE | re.MULTILINE)
+    MORE = re.compile(r'-+\s*More\s*-+', re.IGNORECASE)
+
+    CONFIRM = re.compile(r'\[confirm\]', re.IGNORECASE)
+
+    RELOAD_STARTED = re.compile(r'Reload\s+requested|System\s+Bootstrap|Initializing\s+Hardware|Boot\s+Sector\s+Filesystem', re.IGNORECASE)
+
+    SAVE_MODIFIED_CONFIGURATION = re.compile(r'System\s+configuration\s+has\s+been\s+modified\.\s+Save\?\s*\[yes/no\]:?', re.IGNORECASE)
+
+    CONSOLE_LOG_MESSAGE = re.compile(r'^[^\n\r%]*%[A-Z0-9_]+-\d-[A-Z0-9_]+:[^\n\r]*', re.MULTILINE)
+
+    LOGGING_CONSOLE_SETTING = re.compile(r'^(no\s+)?logging\s+console\b', re.IGNORECASE)
+
+    BOOT_VARIABLE = re.compile(r'^BOOT=(?P<value>[^\n\r]*)', re.MULTILINE)
+
+    DIRECTORY_ENTRY = re.compile(r'^[ \t]*(?:\d+[ \t]+)?(?P<type>[-d])[-rwxs]{3,9}[ \t]+\d+[ \t]+(?:[^\r\n]*?[ \t])?(?P<name>\S+)[ \t\r]*$', re.MULTILINE)
+
+    SECRET_ARGUMENT = re.compile(r'(?P<prefix>\b(?:password|secret)\b(?:[ \t]+\d)?[ \t]+)(?P<value>[^\r\n]+)', re.IGNORECASE)
\ No newline at end of file